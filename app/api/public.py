@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import PlainTextResponse
 
 from app.database import db
 from app.core.config import settings
+from app.core.rate_limit import charge_rate_limit
+from app.schemas import receipt as receipt_schemas
 from app.services.receipt import ReceiptService
-from app.services.public import format_receipt_text
+from app.services.public import render_public_receipts
 
 router = APIRouter()
 
@@ -15,6 +19,28 @@ def get_receipt_service(db: AsyncSession = Depends(db.get_db)) -> ReceiptService
     return ReceiptService(db)
 
 
+@router.post(
+    "/batch/",
+    response_model=List[receipt_schemas.PublicBatchItem],
+    summary="Отримати кілька чеків за короткими кодами",
+    description="Повертає тексти чеків для списку коротких кодів (до 100) в тому ж порядку. Для невідомих кодів text дорівнює null. Кожен код списує один токен з окремого ліміту пакетних запитів (PUBLIC_BATCH_RATE_LIMIT_*); пакет, більший за залишок, проходить, а наступні запити чекають, доки ліміт відновиться.",
+)
+async def get_receipts_public_batch(
+    request: Request,
+    batch: receipt_schemas.PublicBatchRequest,
+    receipt_service: ReceiptService = Depends(get_receipt_service),
+):
+    # Окремий бакет пакетних запитів: токен за кожен код
+    await charge_rate_limit(request, len(batch.short_codes))
+    texts = await render_public_receipts(
+        receipt_service, batch.short_codes, settings.LINE_LENGTH, batch.locale
+    )
+    return [
+        receipt_schemas.PublicBatchItem(short_code=code, text=texts.get(code))
+        for code in batch.short_codes
+    ]
+
+
 @router.get(
     "/{short_code}/",
     response_class=PlainTextResponse,
@@ -22,10 +48,14 @@ def get_receipt_service(db: AsyncSession = Depends(db.get_db)) -> ReceiptService
     description="Отримати чек по короткому коду (публічний доступ - авторизація не потрібна).",
 )
 async def get_receipt_public(
-    short_code: str, receipt_service: ReceiptService = Depends(get_receipt_service)
+    short_code: str,
+    receipt_service: ReceiptService = Depends(get_receipt_service),
+    locale: Literal["uk", "en"] = Query("uk", description="Мова тексту чека"),
 ):
-    receipt = await receipt_service.get_receipt_by_short_code(short_code)
-    if not receipt:
+    texts = await render_public_receipts(
+        receipt_service, [short_code], settings.LINE_LENGTH, locale
+    )
+    if short_code not in texts:
         raise HTTPException(status_code=404, detail="Receipt not found")
 
-    return format_receipt_text(receipt, settings.LINE_LENGTH)
+    return texts[short_code]
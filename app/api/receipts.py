@@ -1,27 +1,136 @@
+import asyncio
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Path
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    status,
+    Path,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from starlette.responses import Response, StreamingResponse
 from app.database import db, models
 from app.schemas import receipt as receipt_schemas
 from app.api.users import get_current_user
 from typing import List, Annotated
 from datetime import date
+from app.core.broker import ReceiptBroker, get_broker
+from app.core.cache import ResultCache, get_result_cache, receipts_namespace
 from app.core.config import settings
+from app.core.responses import VARY_ACCEPT, MsgPackResponse, accepts_msgpack
+from app.core.tasks import TaskQueue, get_task_queue
+from app.core.timeouts import run_query
 
+from app.services.money import receipt_minor_amounts, receipt_minor_lines
 from app.services.receipt import ReceiptService
 
 router = APIRouter()
 
+receipt_list_adapter = TypeAdapter(List[receipt_schemas.Receipt])
+
+
+def get_receipt_service(
+    db: AsyncSession = Depends(db.get_db),
+    task_queue: TaskQueue = Depends(get_task_queue),
+) -> ReceiptService:
+    return ReceiptService(db, task_queue)
 
-def get_receipt_service(db: AsyncSession = Depends(db.get_db)) -> ReceiptService:
-    return ReceiptService(db)
+
+def get_receipt_filters(
+    start_date: Annotated[
+        date | None,
+        Query(description="Початкова дата для фільтрації (YYYY-MM-DD)"),
+    ] = None,
+    end_date: Annotated[
+        date | None, Query(description="Кінцева дата для фільтрації (YYYY-MM-DD)")
+    ] = None,
+    min_amount: Annotated[
+        float | None, Query(description="Мінімальна загальна сума для фільтрації")
+    ] = None,
+    max_amount: Annotated[
+        float | None, Query(description="Максимальна загальна сума для фільтрації")
+    ] = None,
+    payment_type: Annotated[
+        receipt_schemas.PaymentType | None,
+        Query(description="Тип платежу для фільтрації"),
+    ] = None,
+) -> receipt_schemas.ReceiptFilters:
+    return receipt_schemas.ReceiptFilters(
+        start_date=start_date,
+        end_date=end_date,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        payment_type=payment_type,
+    )
 
 
 def generate_public_url(short_code: str, prefix: str = "public") -> str:
     return f"{settings.HOST}/{prefix}/{short_code}/"
 
 
+def build_receipt_response(receipt: models.Receipt) -> receipt_schemas.Receipt:
+    if settings.MONEY_MODE == "minor":
+        return build_receipt_response_minor(receipt)
+    return receipt_schemas.Receipt(
+        id=receipt.id,
+        products=[
+            receipt_schemas.Product(
+                name=p.name,
+                price=p.price,
+                quantity=p.quantity,
+                total=p.price * p.quantity,
+            )
+            for p in receipt.product_lines
+        ],
+        payment=receipt_schemas.Payment(
+            type=receipt.payment_type,
+            amount=receipt.payment_amount,
+        ),
+        total=receipt.total,
+        rest=receipt.rest,
+        user_id=receipt.user_id,
+        public_url=generate_public_url(receipt.short_link.short_code),
+        created_at=receipt.created_at,
+    )
+
+
+def build_receipt_response_minor(
+    receipt: models.Receipt,
+) -> receipt_schemas.Receipt:
+    """Same response from integer kopecks: amounts become floats only here.
+
+    Dividing ints rounds correctly, so the floats equal the ones the Decimal
+    path produces.
+    """
+    payment_amount, total, rest = receipt_minor_amounts(receipt)
+    return receipt_schemas.Receipt(
+        id=receipt.id,
+        products=[
+            receipt_schemas.Product(
+                name=line.name,
+                price=line.price / 100,
+                quantity=line.quantity / 100,
+                total=line.price * line.quantity / 10_000,
+            )
+            for line in receipt_minor_lines(receipt)
+        ],
+        payment=receipt_schemas.Payment(
+            type=receipt.payment_type,
+            amount=payment_amount / 100,
+        ),
+        total=total / 100,
+        rest=rest / 100,
+        user_id=receipt.user_id,
+        public_url=generate_public_url(receipt.short_link.short_code),
+        created_at=receipt.created_at,
+    )
+
+
 @router.post(
     "/",
     response_model=receipt_schemas.Receipt,
@@ -32,100 +141,176 @@ async def create_receipt(
     receipt: receipt_schemas.ReceiptCreate,
     current_user: models.User = Depends(get_current_user),
     receipt_service: ReceiptService = Depends(get_receipt_service),
+    idempotency_key: Annotated[
+        str | None,
+        Header(
+            max_length=255,
+            description="Ключ ідемпотентності: повторний запит з тим самим ключем повертає вже створений чек",
+        ),
+    ] = None,
 ):
     db_receipt = await receipt_service.create_receipt(
-        receipt=receipt, user_id=current_user.id
+        receipt=receipt, user_id=current_user.id, idempotency_key=idempotency_key
     )
 
-    return receipt_schemas.Receipt(
-        id=db_receipt.id,
-        products=[
-            receipt_schemas.Product(
-                name=p.name,
-                price=p.price,
-                quantity=p.quantity,
-                total=p.price * p.quantity,
-            )
-            for p in db_receipt.products
-        ],
-        payment=receipt_schemas.Payment(
-            type=db_receipt.payment_type,
-            amount=db_receipt.payment_amount,
-        ),
-        total=db_receipt.total,
-        rest=db_receipt.rest,
-        user_id=db_receipt.user_id,
-        public_url=generate_public_url(db_receipt.short_link.short_code),
-        created_at=db_receipt.created_at,
-    )
+    return build_receipt_response(db_receipt)
 
 
 @router.get(
     "/",
     response_model=List[receipt_schemas.Receipt],
     summary="Отримати список чеків",
-    description="Повертає список чеків для аутентифікованого користувача з можливістю фільтрації та пагінації.",
+    description="Повертає список чеків для аутентифікованого користувача з можливістю фільтрації та пагінації. Підтримує відповідь у форматі MessagePack (Accept: application/msgpack).",
+    responses={200: {"content": {"application/msgpack": {}}}},
 )
 async def list_receipts(
+    request: Request,
     current_user: models.User = Depends(get_current_user),
     receipt_service: ReceiptService = Depends(get_receipt_service),
-    skip: int = Query(0, description="Кількість елементів для пропуску при пагінації"),
-    limit: int = Query(10, description="Кількість елементів на сторінці"),
-    start_date: Annotated[
-        date | None,
-        Query(description="Початкова дата для фільтрації (YYYY-MM-DD)"),
-    ] = None,
-    end_date: Annotated[
-        date | None, Query(description="Кінцева дата для фільтрації (YYYY-MM-DD)")
-    ] = None,
-    min_amount: Annotated[
-        float | None, Query(description="Мінімальна загальна сума для фільтрації")
-    ] = None,
-    max_amount: Annotated[
-        float | None, Query(description="Максимальна загальна сума для фільтрації")
-    ] = None,
-    payment_type: Annotated[
-        receipt_schemas.PaymentType | None,
-        Query(description="Тип платежу для фільтрації"),
-    ] = None,
+    result_cache: ResultCache = Depends(get_result_cache),
+    skip: int = Query(
+        0, ge=0, description="Кількість елементів для пропуску при пагінації"
+    ),
+    limit: int = Query(
+        10,
+        ge=1,
+        le=settings.MAX_PAGE_LIMIT,
+        description="Кількість елементів на сторінці",
+    ),
+    filters: receipt_schemas.ReceiptFilters = Depends(get_receipt_filters),
 ):
-    receipts = await receipt_service.list_receipts(
-        user_id=current_user.id,
+    use_msgpack = accepts_msgpack(request)
+    media_type = MsgPackResponse.media_type if use_msgpack else "application/json"
+    # Кешується вже закодована сторінка, тож попадання не серіалізує нічого
+    cache_key = await result_cache.key(
+        receipts_namespace(current_user.id),
+        media_type=media_type,
         skip=skip,
         limit=limit,
-        start_date=start_date,
-        end_date=end_date,
-        min_amount=min_amount,
-        max_amount=max_amount,
-        payment_type=payment_type,
+        **filters.model_dump(),
     )
+    body = await result_cache.get(cache_key)
+    if body is not None:
+        return Response(
+            body, media_type=media_type, headers={**VARY_ACCEPT, "X-Cache": "HIT"}
+        )
 
-    response = []
-    for receipt in receipts:
-        response.append(
-            receipt_schemas.Receipt(
-                id=receipt.id,
-                products=[
-                    receipt_schemas.Product(
-                        name=p.name,
-                        price=p.price,
-                        quantity=p.quantity,
-                        total=p.price * p.quantity,
-                    )
-                    for p in receipt.products
-                ],
-                payment=receipt_schemas.Payment(
-                    type=receipt.payment_type,
-                    amount=receipt.payment_amount,
-                ),
-                total=receipt.total,
-                rest=receipt.rest,
-                user_id=receipt.user_id,
-                public_url=generate_public_url(receipt.short_link.short_code),
-                created_at=receipt.created_at,
-            )
+    receipts = await run_query(
+        request,
+        receipt_service.list_receipts(
+            user_id=current_user.id,
+            skip=skip,
+            limit=limit,
+            **filters.model_dump(),
+        ),
+        settings.QUERY_TIMEOUT,
+        receipt_service.db,
+    )
+
+    response = [build_receipt_response(receipt) for receipt in receipts]
+    if use_msgpack:
+        body = MsgPackResponse([r.model_dump() for r in response]).body
+    else:
+        body = receipt_list_adapter.dump_json(response)
+    await result_cache.set(cache_key, body)
+    return Response(
+        body, media_type=media_type, headers={**VARY_ACCEPT, "X-Cache": "MISS"}
+    )
+
+
+@router.get(
+    "/search/",
+    response_model=List[receipt_schemas.ReceiptSearchResult],
+    summary="Пошук чеків за назвою товару",
+    description="Шукає чеки аутентифікованого користувача за частиною назви товару. Підтримує ті ж фільтри та пагінацію, що й список чеків.",
+)
+async def search_receipts(
+    request: Request,
+    q: Annotated[
+        str, Query(min_length=3, description="Частина назви товару для пошуку")
+    ],
+    current_user: models.User = Depends(get_current_user),
+    receipt_service: ReceiptService = Depends(get_receipt_service),
+    skip: int = Query(
+        0, ge=0, description="Кількість елементів для пропуску при пагінації"
+    ),
+    limit: int = Query(
+        10,
+        ge=1,
+        le=settings.MAX_PAGE_LIMIT,
+        description="Кількість елементів на сторінці",
+    ),
+    filters: receipt_schemas.ReceiptFilters = Depends(get_receipt_filters),
+):
+    results = await run_query(
+        request,
+        receipt_service.search_receipts(
+            user_id=current_user.id,
+            q=q,
+            skip=skip,
+            limit=limit,
+            **filters.model_dump(),
+        ),
+        settings.QUERY_TIMEOUT,
+        receipt_service.db,
+    )
+
+    return [
+        receipt_schemas.ReceiptSearchResult(
+            receipt=build_receipt_response(receipt), highlights=highlights
         )
-    return response
+        for receipt, highlights in results
+    ]
+
+
+async def receipt_events(
+    request: Request,
+    broker: ReceiptBroker,
+    receipt_service: ReceiptService,
+    user_id: uuid.UUID,
+):
+    """Server-sent events with each new receipt of the user."""
+    async with broker.subscribe(str(user_id)) as queue:
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            try:
+                receipt_id = await asyncio.wait_for(
+                    queue.get(), settings.FEED_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            receipt = await receipt_service.get_receipt(
+                receipt_id=uuid.UUID(receipt_id), user_id=user_id
+            )
+            # Не тримаємо з'єднання з пулу між подіями
+            await receipt_service.db.close()
+            if receipt:
+                data = build_receipt_response(receipt).model_dump_json()
+                yield f"id: {receipt.id}\nevent: receipt\ndata: {data}\n\n"
+
+
+@router.get(
+    "/feed/",
+    response_class=StreamingResponse,
+    summary="Стрічка нових чеків",
+    description="Server-Sent Events потік: надсилає кожен новий чек аутентифікованого користувача одразу після його створення.",
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def receipts_feed(
+    request: Request,
+    current_user: models.User = Depends(get_current_user),
+    receipt_service: ReceiptService = Depends(get_receipt_service),
+    broker: ReceiptBroker = Depends(get_broker),
+):
+    # Сесія автентифікації звільняє з'єднання до початку потоку
+    await receipt_service.db.close()
+    return StreamingResponse(
+        receipt_events(request, broker, receipt_service, current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get(
@@ -147,24 +332,4 @@ async def get_receipt(
             status_code=status.HTTP_404_NOT_FOUND, detail="Receipt not found"
         )
 
-    return receipt_schemas.Receipt(
-        id=receipt.id,
-        products=[
-            receipt_schemas.Product(
-                name=p.name,
-                price=p.price,
-                quantity=p.quantity,
-                total=p.price * p.quantity,
-            )
-            for p in receipt.products
-        ],
-        payment=receipt_schemas.Payment(
-            type=receipt.payment_type,
-            amount=receipt.payment_amount,
-        ),
-        total=receipt.total,
-        rest=receipt.rest,
-        user_id=receipt.user_id,
-        public_url=generate_public_url(receipt.short_link.short_code),
-        created_at=receipt.created_at,
-    )
+    return build_receipt_response(receipt)
@@ -0,0 +1,117 @@
+import zlib
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.users import get_current_user
+from app.core.tasks import TaskQueue, get_task_queue
+from app.database import db, models
+from app.schemas import receipt as receipt_schemas
+from app.services.short_codes import MAX_BLOCK_SIZE
+from app.services.sync import SyncService
+
+router = APIRouter()
+
+MAX_SYNC_BODY_SIZE = 10 * 1024 * 1024
+
+
+def get_sync_service(
+    db: AsyncSession = Depends(db.get_db),
+    task_queue: TaskQueue = Depends(get_task_queue),
+) -> SyncService:
+    return SyncService(db, task_queue)
+
+
+def batch_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="Sync batch is too large",
+    )
+
+
+async def read_limited_body(request: Request, limit: int) -> bytes:
+    """Reads the request body, failing as soon as it grows past the limit."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise batch_too_large()
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise batch_too_large()
+    return bytes(body)
+
+
+async def read_sync_batch(
+    request: Request,
+    # Автентифікація до читання тіла, щоб анонім не міг завантажити 10 МБ
+    current_user: models.User = Depends(get_current_user),
+) -> receipt_schemas.SyncBatch:
+    """Reads a (optionally gzip-compressed) JSON batch from the request body.
+
+    The limit applies both to the bytes on the wire and to the decompressed
+    JSON.
+    """
+    body = await read_limited_body(request, MAX_SYNC_BODY_SIZE)
+    encoding = request.headers.get("content-encoding", "identity").lower()
+    if encoding == "gzip":
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(body, MAX_SYNC_BODY_SIZE)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip body")
+        if decompressor.unconsumed_tail:
+            raise batch_too_large()
+    elif encoding != "identity":
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported Content-Encoding: {encoding}",
+        )
+
+    try:
+        return receipt_schemas.SyncBatch.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+@router.post(
+    "/short-code-blocks/",
+    response_model=receipt_schemas.ShortCodeBlock,
+    summary="Зарезервувати блок коротких кодів",
+    description="Резервує діапазон коротких кодів для офлайн-каси, щоб вона могла видавати публічні посилання без з'єднання.",
+)
+async def allocate_short_code_block(
+    size: int = Query(1000, ge=1, le=MAX_BLOCK_SIZE, description="Кількість кодів"),
+    current_user: models.User = Depends(get_current_user),
+    sync_service: SyncService = Depends(get_sync_service),
+):
+    block = await sync_service.allocate_short_code_block(
+        user_id=current_user.id, size=size
+    )
+    return receipt_schemas.ShortCodeBlock(block_id=block.id, size=block.size)
+
+
+@router.post(
+    "/receipts/",
+    response_model=receipt_schemas.SyncAck,
+    summary="Синхронізація чеків з офлайн-каси",
+    description="Приймає пакет чеків (JSON, опційно стиснутий gzip, до 10 МБ) і повертає ID збережених та відхилених чеків. Чек із вже використаним коротким кодом відхиляється окремо, решта пакета зберігається.",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": receipt_schemas.SyncBatch.model_json_schema()
+                }
+            }
+        }
+    },
+)
+async def sync_receipts(
+    batch: receipt_schemas.SyncBatch = Depends(read_sync_batch),
+    current_user: models.User = Depends(get_current_user),
+    sync_service: SyncService = Depends(get_sync_service),
+):
+    return await sync_service.sync_receipts(user_id=current_user.id, batch=batch)
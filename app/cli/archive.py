@@ -0,0 +1,55 @@
+"""Moves old receipts into archive segment files.
+
+    python -m app.cli.archive --older-than-months 12
+
+Archived receipts disappear from the receipts/products tables and stay
+available through their public short links.
+"""
+
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.database import db
+from app.services.archive import ArchiveService, months_ago
+
+
+async def archive(older_than_months: int, batch_size: int, archive_dir: str) -> int:
+    cutoff = months_ago(older_than_months)
+    if settings.RESULT_CACHE_BACKEND == "memory":
+        # Кеш у пам'яті API-процесу звідси не інвалідувати
+        print(
+            "RESULT_CACHE_BACKEND=memory: the API keeps listing archived receipts "
+            f"for up to {settings.RESULT_CACHE_TTL:g}s, use redis to share invalidations"
+        )
+    total = 0
+    # Пакетне архівування може тривати довше за тайм-аут запитів API
+    db.init_engine(connect_args={"server_settings": {"statement_timeout": "0"}})
+    try:
+        async with db.get_session_factory()() as session:
+            service = ArchiveService(session, archive_dir)
+            while archived := await service.archive_before(cutoff, batch_size):
+                total += archived
+                print(f"Archived {total} receipts created before {cutoff:%Y-%m-%d}")
+    finally:
+        await db.dispose_engine()
+    return total
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Archive old receipts")
+    parser.add_argument(
+        "--older-than-months", type=int, default=settings.ARCHIVE_AFTER_MONTHS
+    )
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    args = parser.parse_args(argv)
+
+    total = asyncio.run(
+        archive(args.older_than_months, args.batch_size, args.archive_dir)
+    )
+    print(f"Done: {total} receipts archived")
+
+
+if __name__ == "__main__":
+    main()
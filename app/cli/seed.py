@@ -0,0 +1,335 @@
+"""Seeds the database with a large, production-like synthetic data set.
+
+    python -m app.cli.seed --users 100000 --receipts-per-user 30 --seed 42
+
+Data is written with COPY in batches, one transaction per batch. The same
+seed, arguments and --end-date always produce the same rows, so benchmarks
+and EXPLAIN plans can be compared between machines. Seed an empty database
+(or use a new seed): usernames and short codes of one seed collide on a
+rerun.
+
+All seeded users share the password "password".
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.services.short_codes import encode_base62
+from app.services.totals import CENT
+
+# Посівні коди мають 9 символів і не збігаються з живими (8) та офлайн (10)
+SHORT_CODE_LENGTH = 9
+SHORT_CODE_SPACE = 62**SHORT_CODE_LENGTH
+# Множник, взаємно простий з 62, переставляє номери в псевдовипадкові коди
+SHORT_CODE_MULTIPLIER = 6_364_136_223_846_793_005 % SHORT_CODE_SPACE | 1
+
+CATALOG_WORDS = (
+    "Хліб Молоко Кефір Сир Масло Йогурт Яйця Ковбаса Сосиски Курка Свинина "
+    "Яблука Банани Апельсини Картопля Цибуля Морква Томати Огірки Гречка Рис "
+    "Макарони Борошно Цукор Сіль Кава Чай Шоколад Печиво Вода Сік Пиво Вино "
+    "Мило Шампунь Папір Серветки Порошок Батарейки Корм"
+).split()
+CATALOG_QUALIFIERS = (
+    "класичний домашній органічний фермерський преміум акційний нежирний "
+    "великий малий сімейний"
+).split()
+
+
+@dataclass
+class SeedConfig:
+    users: int = 1000
+    receipts_per_user: float = 30
+    months: int = 24
+    catalog_size: int = 5000
+    cashless_ratio: float = 0.65
+    legacy_ratio: float = 0.0
+    seed: int = 42
+    # Дати відраховуються від опівночі цього дня, а не від поточного моменту
+    end_date: date | None = None
+
+
+class SyntheticData:
+    """Deterministic generator of users, receipts, products and short links.
+
+    Distributions: receipts per user are log-normal (a few very active
+    users), basket sizes geometric, product popularity Zipf-like, receipt
+    dates skewed towards recent months and daytime hours.
+    """
+
+    def __init__(self, config: SeedConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.short_code_offset = self.rng.randrange(SHORT_CODE_SPACE)
+        self.short_code_index = 0
+        self.catalog = self._build_catalog()
+        self.catalog_cum_weights = list(
+            itertools.accumulate(
+                1 / (rank + 1) ** 1.1 for rank in range(len(self.catalog))
+            )
+        )
+        self.span_seconds = config.months * 30 * 24 * 3600
+        self.end = datetime.combine(
+            config.end_date or datetime.now(timezone.utc).date(),
+            dt_time(),
+            tzinfo=timezone.utc,
+        )
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _build_catalog(self) -> list[tuple[str, Decimal, bool]]:
+        catalog = []
+        for i in range(self.config.catalog_size):
+            name = (
+                f"{self.rng.choice(CATALOG_WORDS)} "
+                f"{self.rng.choice(CATALOG_QUALIFIERS)} {i}"
+            )
+            price = Decimal(str(round(math.exp(self.rng.gauss(3.8, 1.0)), 2)))
+            # Частина товарів продається на вагу
+            weighted = self.rng.random() < 0.15
+            catalog.append((name, max(price, CENT), weighted))
+        return catalog
+
+    def _short_code(self) -> str:
+        value = (
+            self.short_code_index * SHORT_CODE_MULTIPLIER + self.short_code_offset
+        ) % SHORT_CODE_SPACE
+        self.short_code_index += 1
+        return encode_base62(value, SHORT_CODE_LENGTH)
+
+    def _created_at(self) -> datetime:
+        # Квадратний корінь зсуває розподіл до недавніх дат (зростання бізнесу)
+        age = (1 - math.sqrt(self.rng.random())) * self.span_seconds
+        day = self.end - timedelta(days=1, seconds=age)
+        hour = min(23, max(7, round(self.rng.gauss(15, 3.5))))
+        return day.replace(
+            hour=hour,
+            minute=self.rng.randrange(60),
+            second=self.rng.randrange(60),
+            microsecond=0,
+        )
+
+    def _quantity(self, weighted: bool) -> Decimal:
+        if weighted:
+            return Decimal(self.rng.randint(10, 300)) / 100
+        return Decimal(1 if self.rng.random() < 0.8 else self.rng.randint(2, 6))
+
+    def _payment_amount(self, payment_type: str, total: Decimal) -> Decimal:
+        if payment_type == "cashless":
+            return total
+        # Готівку дають купюрами, тож сума округлюється вгору
+        note = self.rng.choice((1, 10, 50, 100, 200, 500))
+        return Decimal(math.ceil(total / note) * note).quantize(CENT)
+
+    def users(self, password_hash: str):
+        """Yields user rows: (id, username, full_name, hashed_password)."""
+        for i in range(self.config.users):
+            yield (
+                self._uuid(),
+                f"seed{self.config.seed}_user{i}",
+                f"Seed User {i}",
+                password_hash,
+            )
+
+    def receipts(self, user_id: uuid.UUID):
+        """Yields (receipt, products, short_link) rows of one user."""
+        count = int(
+            self.rng.lognormvariate(math.log(self.config.receipts_per_user), 0.9)
+        )
+        for _ in range(count):
+            receipt_id = self._uuid()
+            basket = min(50, 1 + int(math.log(1 - self.rng.random()) / math.log(0.75)))
+            products = []
+            for name, price, weighted in self.rng.choices(
+                self.catalog, cum_weights=self.catalog_cum_weights, k=basket
+            ):
+                quantity = self._quantity(weighted)
+                products.append(
+                    (
+                        receipt_id,
+                        name,
+                        price,
+                        quantity,
+                        int(price.scaleb(2)),
+                        int(quantity.scaleb(2)),
+                    )
+                )
+
+            total = sum(
+                (price * quantity for _, _, price, quantity, *_ in products), Decimal(0)
+            ).quantize(CENT, rounding=ROUND_HALF_UP)
+            payment_type = (
+                "cashless" if self.rng.random() < self.config.cashless_ratio else "cash"
+            )
+            amount = self._payment_amount(payment_type, total)
+            snapshot = None
+            if self.rng.random() >= self.config.legacy_ratio:
+                snapshot = json.dumps(
+                    [
+                        {
+                            "name": name,
+                            "price": f"{price:.2f}",
+                            "quantity": f"{q:.2f}",
+                            "price_minor": price_minor,
+                            "quantity_minor": quantity_minor,
+                        }
+                        for _, name, price, q, price_minor, quantity_minor in products
+                    ],
+                    ensure_ascii=False,
+                )
+            receipt = (
+                receipt_id,
+                user_id,
+                payment_type,
+                amount,
+                total,
+                amount - total,
+                self._created_at(),
+                snapshot,
+                int(amount.scaleb(2)),
+                int(total.scaleb(2)),
+                int((amount - total).scaleb(2)),
+            )
+            yield receipt, products, (receipt_id, self._short_code())
+
+
+USER_COLUMNS = ("id", "username", "full_name", "hashed_password")
+RECEIPT_COLUMNS = (
+    "id",
+    "user_id",
+    "payment_type",
+    "payment_amount",
+    "total",
+    "rest",
+    "created_at",
+    "products_snapshot",
+    "payment_amount_minor",
+    "total_minor",
+    "rest_minor",
+)
+PRODUCT_COLUMNS = (
+    "receipt_id",
+    "name",
+    "price",
+    "quantity",
+    "price_minor",
+    "quantity_minor",
+)
+SHORT_LINK_COLUMNS = ("receipt_id", "short_code")
+
+
+async def copy_batch(connection, users, receipts, products, short_links) -> None:
+    async with connection.transaction():
+        for table, columns, records in (
+            ("users", USER_COLUMNS, users),
+            ("receipts", RECEIPT_COLUMNS, receipts),
+            ("products", PRODUCT_COLUMNS, products),
+            ("short_links", SHORT_LINK_COLUMNS, short_links),
+        ):
+            if records:
+                await connection.copy_records_to_table(
+                    table, records=records, columns=columns
+                )
+
+
+async def seed(config: SeedConfig, batch_size: int, dsn: str) -> dict[str, int]:
+    import asyncpg
+
+    data = SyntheticData(config)
+    password_hash = get_password_hash("password")
+    counts = {"users": 0, "receipts": 0, "products": 0}
+    users, receipts, products, short_links = [], [], [], []
+    started = time.perf_counter()
+
+    connection = await asyncpg.connect(dsn)
+    try:
+        for user in data.users(password_hash):
+            users.append(user)
+            for receipt, receipt_products, short_link in data.receipts(user[0]):
+                receipts.append(receipt)
+                products.extend(receipt_products)
+                short_links.append(short_link)
+
+            if len(receipts) >= batch_size or len(users) >= batch_size:
+                await copy_batch(connection, users, receipts, products, short_links)
+                counts["users"] += len(users)
+                counts["receipts"] += len(receipts)
+                counts["products"] += len(products)
+                users, receipts, products, short_links = [], [], [], []
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{counts['users']} users, {counts['receipts']} receipts "
+                    f"({counts['receipts'] / elapsed:.0f} receipts/s)"
+                )
+
+        await copy_batch(connection, users, receipts, products, short_links)
+        counts["users"] += len(users)
+        counts["receipts"] += len(receipts)
+        counts["products"] += len(products)
+
+        # Свіжа статистика, щоб EXPLAIN показував плани для нового обсягу
+        await connection.execute("ANALYZE users, receipts, products, short_links")
+    finally:
+        await connection.close()
+    return counts
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with test data")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--receipts-per-user",
+        type=float,
+        default=30,
+        help="Median receipts per user (log-normal)",
+    )
+    parser.add_argument("--months", type=int, default=24, help="Date range of receipts")
+    parser.add_argument("--catalog-size", type=int, default=5000)
+    parser.add_argument("--cashless-ratio", type=float, default=0.65)
+    parser.add_argument(
+        "--legacy-ratio",
+        type=float,
+        default=0.0,
+        help="Share of receipts without a products snapshot",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=None,
+        help="Last day of receipts, YYYY-MM-DD (default: yesterday)",
+    )
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    config = SeedConfig(
+        users=args.users,
+        receipts_per_user=args.receipts_per_user,
+        months=args.months,
+        catalog_size=args.catalog_size,
+        cashless_ratio=args.cashless_ratio,
+        legacy_ratio=args.legacy_ratio,
+        seed=args.seed,
+        end_date=args.end_date,
+    )
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+    counts = asyncio.run(seed(config, args.batch_size, dsn))
+    print(
+        f"Done: {counts['users']} users, {counts['receipts']} receipts, "
+        f"{counts['products']} products"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Production server entry point.
+
+    python -m app.cli.serve --workers 4
+
+Runs several uvicorn worker processes, picks uvloop/httptools when they are
+installed and splits the database connection budget between the workers.
+"""
+
+import argparse
+import importlib.util
+import os
+
+import uvicorn
+
+from app.core.config import Settings, settings
+
+
+def worker_pool_size(max_connections: int, workers: int, reserved: int = 0) -> int:
+    """Per-worker pool size so that all workers together stay within the limit.
+
+    reserved is the number of connections each worker opens outside its pool.
+    """
+    return max(1, max_connections // workers - reserved)
+
+
+def multi_worker_overrides(workers: int) -> dict[str, str]:
+    """Settings to override when in-process state would diverge between workers.
+
+    Returns environment variables for the worker processes, with a note
+    printed for each override.
+    """
+    if workers <= 1:
+        return {}
+    overrides = {}
+    if settings.RESULT_CACHE_BACKEND == "memory":
+        # Інвалідація в пам'яті не доходить до інших воркерів
+        overrides["RESULT_CACHE_BACKEND"] = "none"
+        print("In-memory result cache disabled, use RESULT_CACHE_BACKEND=redis")
+    if settings.BROKER_BACKEND == "memory":
+        # Чек, створений в одному воркері, інакше не потрапить у стрічки інших
+        overrides["BROKER_BACKEND"] = "postgres"
+        print("In-memory receipt broker replaced with BROKER_BACKEND=postgres")
+    if settings.RATE_LIMIT_ENABLED and settings.RATE_LIMIT_BACKEND == "memory":
+        # Кожен воркер має свої бакети, тож ділимо ліміт, щоб сума не перевищувала його
+        for name in ("RATE_LIMIT", "PUBLIC_RATE_LIMIT", "PUBLIC_BATCH_RATE_LIMIT"):
+            per_minute = getattr(settings, f"{name}_PER_MINUTE")
+            burst = getattr(settings, f"{name}_BURST")
+            overrides[f"{name}_PER_MINUTE"] = str(per_minute / workers)
+            overrides[f"{name}_BURST"] = str(max(1, burst // workers))
+        print(
+            f"In-memory rate limits split between {workers} workers,"
+            " use RATE_LIMIT_BACKEND=redis for exact limits"
+        )
+    return overrides
+
+
+def apply_overrides(overrides: dict[str, str]) -> None:
+    """Applies setting overrides to this process and to the worker processes.
+
+    Worker processes build their settings from the environment. With one
+    worker uvicorn imports the app in this process, where settings already
+    exist, so they are updated in place as well.
+    """
+    os.environ.update(overrides)
+    parsed = Settings()
+    for name in overrides:
+        setattr(settings, name, getattr(parsed, name))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the API with multiple workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY") or os.cpu_count() or 1),
+        help="Number of worker processes (default: WEB_CONCURRENCY or CPU count)",
+    )
+    parser.add_argument(
+        "--db-max-connections",
+        type=int,
+        default=settings.DB_MAX_CONNECTIONS,
+        help="Total DB connections shared by all workers",
+    )
+    parser.add_argument(
+        "--timeout-graceful-shutdown",
+        type=int,
+        default=30,
+        help="Seconds to finish in-flight requests on shutdown",
+    )
+    parser.add_argument("--timeout-keep-alive", type=int, default=5)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--proxy-headers", action="store_true")
+    args = parser.parse_args(argv)
+
+    overrides = multi_worker_overrides(args.workers)
+    broker_backend = overrides.get("BROKER_BACKEND", settings.BROKER_BACKEND)
+    # PostgresReceiptBroker тримає власне LISTEN-з'єднання в кожному воркері
+    reserved = 1 if broker_backend == "postgres" else 0
+    pool_size = worker_pool_size(args.db_max_connections, args.workers, reserved)
+    overrides.update({"DB_POOL_SIZE": str(pool_size), "DB_MAX_OVERFLOW": "0"})
+    if "DB_ECHO" not in os.environ:
+        overrides["DB_ECHO"] = "false"
+    apply_overrides(overrides)
+
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    print(
+        f"Starting {args.workers} worker(s): loop={loop}, http={http}, "
+        f"db pool={pool_size} per worker"
+    )
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        backlog=args.backlog,
+        timeout_keep_alive=args.timeout_keep_alive,
+        timeout_graceful_shutdown=args.timeout_graceful_shutdown,
+        proxy_headers=args.proxy_headers,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Local-first receipt store for tills that may lose connectivity.
+
+Receipts are validated with the same ``ReceiptCreate`` schema and totals
+logic as the server, stored in SQLite and given a short code from a block
+reserved in advance, so a public link can be printed while offline. ``sync``
+later uploads pending receipts in gzip-compressed batches and marks the ones
+the server acknowledged.
+
+    till = OfflineTill("till.db", httpx.AsyncClient(base_url=..., headers=auth))
+    await till.reserve_short_codes()          # while online
+    receipt = till.create_receipt(ReceiptCreate(...))
+    await till.sync()                         # whenever the network is back
+"""
+
+import gzip
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from app.schemas import receipt as receipt_schemas
+from app.services.short_codes import offline_short_code
+from app.services.totals import calculate_totals
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    id TEXT PRIMARY KEY,
+    short_code TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    total TEXT NOT NULL,
+    rest TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    reject_reason TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_receipts_status ON receipts (status);
+CREATE TABLE IF NOT EXISTS short_code_blocks (
+    block_id INTEGER PRIMARY KEY,
+    size INTEGER NOT NULL,
+    next_index INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class NoShortCodesLeft(Exception):
+    """Raised when every reserved short code has been used."""
+
+
+class OfflineTill:
+    def __init__(self, db_path: str, client: httpx.AsyncClient):
+        self.client = client
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def free_short_codes(self) -> int:
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(size - next_index), 0) FROM short_code_blocks"
+        ).fetchone()
+        return row[0]
+
+    async def reserve_short_codes(self, min_free: int = 500, size: int = 1000) -> int:
+        """Reserves blocks on the server until at least min_free codes are available."""
+        while self.free_short_codes() < min_free:
+            response = await self.client.post(
+                "/sync/short-code-blocks/", params={"size": size}
+            )
+            response.raise_for_status()
+            block = receipt_schemas.ShortCodeBlock.model_validate(response.json())
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO short_code_blocks (block_id, size) VALUES (?, ?)",
+                    (block.block_id, block.size),
+                )
+        return self.free_short_codes()
+
+    def _next_short_code(self) -> str:
+        row = self.conn.execute(
+            "SELECT block_id, next_index FROM short_code_blocks "
+            "WHERE next_index < size ORDER BY block_id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            raise NoShortCodesLeft("Reserve short codes before going offline")
+        self.conn.execute(
+            "UPDATE short_code_blocks SET next_index = next_index + 1 "
+            "WHERE block_id = ?",
+            (row["block_id"],),
+        )
+        return offline_short_code(row["block_id"], row["next_index"])
+
+    def create_receipt(self, receipt: receipt_schemas.ReceiptCreate) -> dict:
+        """Stores a receipt locally and returns it with its totals and short code."""
+        total, rest = calculate_totals(receipt)
+        receipt_id = uuid.uuid4()
+        created_at = datetime.now(timezone.utc)
+
+        # Код і чек фіксуються разом, щоб код не видався двічі після збою
+        with self.conn:
+            short_code = self._next_short_code()
+            self.conn.execute(
+                "INSERT INTO receipts (id, short_code, created_at, payload, total, rest) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    str(receipt_id),
+                    short_code,
+                    created_at.isoformat(),
+                    receipt.model_dump_json(),
+                    str(total),
+                    str(rest),
+                ),
+            )
+
+        return {
+            "id": receipt_id,
+            "short_code": short_code,
+            "created_at": created_at,
+            "total": total,
+            "rest": rest,
+        }
+
+    def pending_count(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM receipts WHERE status = 'pending'"
+        ).fetchone()[0]
+
+    async def sync(self, batch_size: int = 200) -> tuple[int, int]:
+        """Uploads pending receipts in batches. Returns (acked, rejected) counts."""
+        acked_total = rejected_total = 0
+        last_id = ""
+        while True:
+            rows = self.conn.execute(
+                "SELECT * FROM receipts WHERE status = 'pending' AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            batch = {
+                "receipts": [
+                    {
+                        **json.loads(row["payload"]),
+                        "id": row["id"],
+                        "short_code": row["short_code"],
+                        "created_at": row["created_at"],
+                    }
+                    for row in rows
+                ]
+            }
+            response = await self.client.post(
+                "/sync/receipts/",
+                content=gzip.compress(json.dumps(batch).encode()),
+                headers={
+                    "Content-Type": "application/json",
+                    "Content-Encoding": "gzip",
+                },
+            )
+            response.raise_for_status()
+            ack = receipt_schemas.SyncAck.model_validate(response.json())
+
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE receipts SET status = 'synced' WHERE id = ?",
+                    [(str(receipt_id),) for receipt_id in ack.acked],
+                )
+                self.conn.executemany(
+                    "UPDATE receipts SET status = 'rejected', reject_reason = ? "
+                    "WHERE id = ?",
+                    [(r.reason, str(r.id)) for r in ack.rejected],
+                )
+            acked_total += len(ack.acked)
+            rejected_total += len(ack.rejected)
+
+        return acked_total, rejected_total
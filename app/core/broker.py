@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReceiptBroker:
+    """In-process fan-out of new receipt IDs to the subscribers of each user.
+
+    Only sees receipts created in the same process; use PostgresReceiptBroker
+    when the API runs with several workers.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Yields a queue receiving IDs of the user's new receipts."""
+        queue = asyncio.Queue(self.max_queue_size)
+        self._subscribers[user_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[user_id].discard(queue)
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+
+    async def publish(self, user_id: str, receipt_id: str) -> None:
+        self._deliver(user_id, receipt_id)
+
+    def _deliver(self, user_id: str, receipt_id: str) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(receipt_id)
+            except asyncio.QueueFull:
+                # Повільний клієнт не повинен гальмувати інших
+                logger.warning("Receipt feed subscriber of %s is lagging", user_id)
+
+
+class PostgresReceiptBroker(ReceiptBroker):
+    """Fans out receipt events between processes with LISTEN/NOTIFY.
+
+    Holds one connection per process outside the SQLAlchemy pool. When it is
+    lost the broker reconnects with exponential backoff; events published in
+    the meantime are not delivered.
+    """
+
+    CHANNEL = "receipt_events"
+
+    def __init__(
+        self,
+        dsn: str,
+        max_queue_size: int = 100,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30,
+    ):
+        super().__init__(max_queue_size)
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._conn = None
+        self._lost = asyncio.Event()
+        self._reconnect_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        await self._connect()
+        self._reconnect_task = asyncio.create_task(self._reconnect_when_lost())
+
+    async def stop(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+            self._reconnect_task = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def publish(self, user_id: str, receipt_id: str) -> None:
+        if self._conn is None:
+            raise ConnectionError("Receipt broker is not connected")
+        # Одне з'єднання asyncpg не виконує запити паралельно
+        async with self._lock:
+            await self._conn.execute(
+                "SELECT pg_notify($1, $2)", self.CHANNEL, f"{user_id}:{receipt_id}"
+            )
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        self._lost.clear()
+        try:
+            await conn.add_listener(self.CHANNEL, self._on_notify)
+        except Exception:
+            await conn.close()
+            raise
+        conn.add_termination_listener(lambda connection: self._lost.set())
+        self._conn = conn
+
+    async def _reconnect_when_lost(self) -> None:
+        while True:
+            await self._lost.wait()
+            self._conn = None
+            delay = self.reconnect_delay
+            while self._conn is None:
+                logger.warning(
+                    "Receipt broker disconnected, reconnecting in %gs", delay
+                )
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                except Exception:
+                    logger.exception("Receipt broker reconnect failed")
+                    delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        user_id, _, receipt_id = payload.partition(":")
+        self._deliver(user_id, receipt_id)
+
+
+def create_broker() -> ReceiptBroker:
+    if settings.BROKER_BACKEND == "postgres":
+        dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+        return PostgresReceiptBroker(dsn)
+    return ReceiptBroker()
+
+
+broker = create_broker()
+
+
+def get_broker() -> ReceiptBroker:
+    return broker
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Cache of encoded query results, invalidated by per-namespace generations.
+
+    Every key embeds the current generation of its namespace (e.g. one user's
+    receipts), so bumping the generation makes all older entries unreachable
+    in O(1); they are evicted later by size limits or TTL. The base class
+    caches nothing and is used when caching is disabled.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bypass_until = 0.0
+
+    async def key(self, namespace: str, **params: Any) -> str | None:
+        """Builds a key from the namespace generation and normalized params.
+
+        Returns None, which get() and set() treat as uncacheable, if the
+        generation cannot be read or the cache is bypassed.
+        """
+        if time.monotonic() < self.bypass_until:
+            return None
+        try:
+            generation = await self.generation(namespace)
+        except Exception:
+            logger.exception("Result cache generation read failed")
+            return None
+        encoded = json.dumps(params, sort_keys=True, default=str).encode()
+        return f"{namespace}:{generation}:{hashlib.sha256(encoded).hexdigest()}"
+
+    async def generation(self, namespace: str) -> int:
+        return 0
+
+    async def invalidate(self, namespace: str) -> None:
+        pass
+
+    async def get(self, key: str | None) -> bytes | None:
+        self.misses += 1
+        return None
+
+    async def set(self, key: str | None, value: bytes) -> None:
+        pass
+
+    def bypass(self, seconds: float) -> None:
+        """Stops reading and writing entries for the given time.
+
+        Used when an invalidation fails: entries cached before it may be
+        stale until they expire.
+        """
+        self.bypass_until = max(self.bypass_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict[str, float]:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+    def _record(self, value: bytes | None) -> bytes | None:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+class InMemoryResultCache(ResultCache):
+    """LRU result cache in process memory, bounded by entries and total bytes.
+
+    Invalidations are not shared between processes; use RedisResultCache
+    when the API runs with several workers or when receipts are changed by
+    other processes (python -m app.cli.archive), otherwise their lists stay
+    cached for up to ttl seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 300,
+    ):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._size = 0
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def invalidate(self, namespace: str) -> None:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    async def get(self, key: str | None) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            self._evict(key)
+            entry = None
+        if entry is None:
+            return self._record(None)
+        self._entries.move_to_end(key)
+        return self._record(entry[1])
+
+    async def set(self, key: str | None, value: bytes) -> None:
+        if key is None or len(value) > self.max_bytes // 100:
+            # Один великий результат не повинен витісняти весь кеш
+            return
+        if key in self._entries:
+            self._evict(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._size += len(value)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def _evict(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+
+class RedisResultCache(ResultCache):
+    """Result cache shared between processes through Redis.
+
+    Entries expire after ttl seconds; Redis' own maxmemory policy bounds the
+    total size.
+    """
+
+    def __init__(
+        self,
+        client,
+        prefix: str = "result_cache:",
+        ttl: float = 300,
+        max_value_size: int = 1024 * 1024,
+    ):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_value_size = max_value_size
+
+    async def generation(self, namespace: str) -> int:
+        return int(await self.client.get(f"{self.prefix}gen:{namespace}") or 0)
+
+    async def invalidate(self, namespace: str) -> None:
+        await self.client.incr(f"{self.prefix}gen:{namespace}")
+
+    async def get(self, key: str | None) -> bytes | None:
+        if key is None:
+            return self._record(None)
+        try:
+            value = await self.client.get(self.prefix + key)
+        except Exception:
+            # Недоступний Redis означає лише промах кешу
+            logger.exception("Result cache read failed")
+            value = None
+        return self._record(value)
+
+    async def set(self, key: str | None, value: bytes) -> None:
+        if key is None or len(value) > self.max_value_size:
+            return
+        try:
+            await self.client.set(self.prefix + key, value, ex=int(self.ttl))
+        except Exception:
+            logger.exception("Result cache write failed")
+
+
+def create_result_cache() -> ResultCache:
+    if settings.RESULT_CACHE_BACKEND == "redis":
+        from redis import asyncio as aioredis
+
+        return RedisResultCache(
+            aioredis.from_url(settings.REDIS_URL), ttl=settings.RESULT_CACHE_TTL
+        )
+    if settings.RESULT_CACHE_BACKEND == "memory":
+        return InMemoryResultCache(
+            max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+            ttl=settings.RESULT_CACHE_TTL,
+        )
+    return ResultCache()
+
+
+result_cache = create_result_cache()
+
+
+def get_result_cache() -> ResultCache:
+    return result_cache
+
+
+def receipts_namespace(user_id) -> str:
+    return f"receipts:{user_id}"
+
+
+async def invalidate_receipts(*user_ids) -> None:
+    """Drops cached receipt lists of the users after their receipts changed."""
+    for user_id in user_ids:
+        try:
+            await result_cache.invalidate(receipts_namespace(user_id))
+        except Exception:
+            # Запис уже зафіксовано, тож помилка кешу не повинна валити запит,
+            # але старі списки не можна віддавати, доки вони не застаріють
+            logger.exception("Failed to invalidate receipts cache of %s", user_id)
+            result_cache.bypass(settings.RESULT_CACHE_TTL)
@@ -1,23 +1,73 @@
-import os
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from dotenv import load_dotenv
-
-load_dotenv()
 
 
 class Settings(BaseSettings):
-    POSTGRES_USER: str = os.getenv("POSTGRES_USER")
-    POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD")
-    POSTGRES_DB: str = os.getenv("POSTGRES_DB")
-    POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
-    POSTGRES_PORT: int = int(os.getenv("POSTGRES_PORT", 5432))
-
-    SECRET_KEY: str = os.getenv("SECRET_KEY")
-    ALGORITHM: str = os.getenv("ALGORITHM")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-    LINE_LENGTH: int = int(os.getenv("LINE_LENGTH", 32))
-    HOST: str = os.getenv("HOST", "http://localhost:8000")
+    # Значення читаються з оточення та файлу .env під час створення Settings,
+    # без окремого load_dotenv() на етапі імпорту
+    POSTGRES_USER: str
+    POSTGRES_PASSWORD: str
+    POSTGRES_DB: str
+    POSTGRES_HOST: str = "localhost"
+    POSTGRES_PORT: int = 5432
+
+    SECRET_KEY: str
+    ALGORITHM: str
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    USERNAME_FILTER_CAPACITY: int = 100_000
+    LINE_LENGTH: int = 32
+    RECEIPT_HEADER: str = "ФОП Checkbox Test Task"
+    RENDER_CACHE_SIZE: int = 10_000
+    RENDER_CACHE_TTL: float = 3600
+    # decimal - розрахунки в Decimal, minor - цілі копійки
+    MONEY_MODE: Literal["decimal", "minor"] = "decimal"
+    HOST: str = "http://localhost:8000"
+
+    DB_ECHO: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Загальний ліміт з'єднань до БД, який ділиться між воркерами сервера
+    DB_MAX_CONNECTIONS: int = 90
+    # Серверний запобіжник для будь-якого запиту, мс (0 - без обмеження)
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+    # Клієнтський тайм-аут важких маршрутів (список, пошук), с
+    QUERY_TIMEOUT: float = 5
+    MAX_PAGE_LIMIT: int = 100
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_PER_MINUTE: float = 120
+    RATE_LIMIT_BURST: int = 60
+    PUBLIC_RATE_LIMIT_PER_MINUTE: float = 30
+    PUBLIC_RATE_LIMIT_BURST: int = 10
+    # Пакетний пошук POST /public/batch/ рахується в кодах, а не в запитах
+    PUBLIC_BATCH_RATE_LIMIT_PER_MINUTE: float = 300
+    PUBLIC_BATCH_RATE_LIMIT_BURST: int = 100
+    LOAD_SHED_POOL_RATIO: float = 1.0
+    LOAD_SHED_PUBLIC_POOL_RATIO: float = 0.75
+
+    COMPRESSION_MINIMUM_SIZE: int = 500
+
+    # memory - лише для одного воркера, redis - спільний, none - вимкнено
+    RESULT_CACHE_BACKEND: str = "memory"
+    RESULT_CACHE_TTL: float = 300
+    RESULT_CACHE_MAX_ENTRIES: int = 10_000
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # memory - лише в межах процесу, postgres - LISTEN/NOTIFY між воркерами
+    BROKER_BACKEND: str = "memory"
+    FEED_HEARTBEAT_SECONDS: float = 15
+
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_AFTER_MONTHS: int = 12
+
+    TASK_QUEUE_CONCURRENCY: int = 4
+    TASK_QUEUE_MAX_SIZE: int = 1000
+    TASK_QUEUE_MAX_RETRIES: int = 3
+    TASK_QUEUE_DRAIN_TIMEOUT: float = 10
+    TASK_QUEUE_DURABLE: bool = False
 
     @property
     def DATABASE_URL(self) -> str:
@@ -0,0 +1,220 @@
+import logging
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, status
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import decode_token
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_STATE = "rate_limit_bucket"
+# Маршрути, що списують токени самі через charge_rate_limit()
+CHARGED_BY_ROUTE = frozenset({"/public/batch/"})
+
+
+class InMemoryRateLimiter:
+    """Token bucket rate limiter keeping buckets in process memory (LRU bounded)."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(
+        self,
+        key: str,
+        rate: float,
+        capacity: int,
+        now: float | None = None,
+        cost: int = 1,
+    ) -> float:
+        """Takes cost tokens if the bucket holds at least one.
+
+        A cost above the balance leaves the bucket in debt, which later
+        requests wait out; cost 0 only checks the bucket. Returns 0 or
+        seconds to wait.
+        """
+        now = time.monotonic() if now is None else now
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= cost
+        else:
+            retry_after = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimiter:
+    """Token bucket rate limiter shared between processes through Redis.
+
+    Works with any client exposing the redis-py asyncio ``eval`` signature,
+    so it can be tested against a local fake server.
+    """
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - cost
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self, client, prefix: str = "rate_limit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def acquire(
+        self,
+        key: str,
+        rate: float,
+        capacity: int,
+        now: float | None = None,
+        cost: int = 1,
+    ) -> float:
+        """Same as InMemoryRateLimiter.acquire()."""
+        now = time.time() if now is None else now
+        # Redis повертає дробові числа з Lua лише як рядки
+        retry_after = await self.client.eval(
+            self.SCRIPT, 1, self.prefix + key, rate, capacity, now, cost
+        )
+        return float(retry_after)
+
+
+async def charge_rate_limit(request: Request, cost: int) -> None:
+    """Takes tokens from the bucket the middleware admitted the request with.
+
+    For routes doing several lookups per request (public batch), so a batch
+    costs as much as the same number of single requests. A no-op when rate
+    limiting is disabled.
+    """
+    bucket = request.scope.get("state", {}).get(RATE_LIMIT_STATE)
+    if bucket is None or cost <= 0:
+        return
+    limiter, key, rate, capacity = bucket
+    try:
+        retry_after = await limiter.acquire(key, rate, capacity, cost=cost)
+    except Exception:
+        logger.exception("Rate limiter failed, request admitted")
+        return
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+
+def create_rate_limiter() -> InMemoryRateLimiter | RedisRateLimiter:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        from redis import asyncio as aioredis
+
+        return RedisRateLimiter(aioredis.from_url(settings.REDIS_URL))
+    return InMemoryRateLimiter()
+
+
+class AdmissionControlMiddleware:
+    """Rejects requests early when the DB pool is saturated or a bucket is empty.
+
+    Anonymous public lookups are shed at a lower pool usage than authenticated
+    traffic and are limited per client address, authenticated requests are
+    limited per user.
+    """
+
+    def __init__(self, app: ASGIApp, limiter=None):
+        self.app = app
+        self.limiter = limiter or create_rate_limiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        is_public = scope["path"].startswith("/public/")
+        shed_ratio = (
+            settings.LOAD_SHED_PUBLIC_POOL_RATIO
+            if is_public
+            else settings.LOAD_SHED_POOL_RATIO
+        )
+        if db.pool_usage() >= shed_ratio:
+            response = JSONResponse(
+                {"detail": "Service is overloaded, try again later"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        key, rate, capacity = self._bucket(scope, is_public)
+        # Пакетний маршрут сам списує токен за кожен код, тут лише перевірка
+        cost = 0 if scope["path"] in CHARGED_BY_ROUTE else 1
+        try:
+            retry_after = await self.limiter.acquire(key, rate, capacity, cost=cost)
+        except Exception:
+            # Недоступний бекенд лімітів не повинен валити API
+            logger.exception("Rate limiter failed, request admitted")
+            retry_after = 0
+        if retry_after > 0:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, round(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        # Маршрути, що роблять кілька пошуків за запит, дозаряджають той самий бакет
+        scope.setdefault("state", {})[RATE_LIMIT_STATE] = (
+            self.limiter,
+            key,
+            rate,
+            capacity,
+        )
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _bucket(scope: Scope, is_public: bool) -> tuple[str, float, int]:
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        if scope["path"] in CHARGED_BY_ROUTE:
+            return (
+                f"public_batch:{client_ip}",
+                settings.PUBLIC_BATCH_RATE_LIMIT_PER_MINUTE / 60,
+                settings.PUBLIC_BATCH_RATE_LIMIT_BURST,
+            )
+        if is_public:
+            return (
+                f"public:{client_ip}",
+                settings.PUBLIC_RATE_LIMIT_PER_MINUTE / 60,
+                settings.PUBLIC_RATE_LIMIT_BURST,
+            )
+
+        key = f"ip:{client_ip}"
+        headers = dict(scope["headers"])
+        scheme, _, token = headers.get(b"authorization", b"").decode().partition(" ")
+        if scheme.lower() == "bearer" and token:
+            payload = decode_token(token)
+            if payload and payload.get("sub"):
+                key = f"user:{payload['sub']}"
+        return key, settings.RATE_LIMIT_PER_MINUTE / 60, settings.RATE_LIMIT_BURST
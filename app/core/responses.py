@@ -0,0 +1,27 @@
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # опційна залежність
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+# Для кожної відповіді, формат якої обрано за Accept, щоб кеші не змішували формати
+VARY_ACCEPT = {"Vary": "Accept"}
+
+
+def accepts_msgpack(request: Request) -> bool:
+    """Whether the client asked for MessagePack and it can be produced."""
+    accept = request.headers.get("accept", "")
+    return msgpack is not None and any(t in accept for t in MSGPACK_MEDIA_TYPES)
+
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        # UUID та інші нестандартні типи передаються рядками, дати - як Timestamp
+        return msgpack.packb(content, default=str, datetime=True)
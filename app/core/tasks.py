@@ -0,0 +1,275 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import delete, select, update
+
+from app.core.config import settings
+from app.database import db, models
+
+logger = logging.getLogger(__name__)
+
+TaskHandler = Callable[..., Awaitable[None]]
+
+
+@dataclass
+class Job:
+    name: str
+    payload: dict[str, Any]
+    attempts: int = 0
+    id: int | None = None
+
+
+class TaskQueue:
+    """In-process async task queue with bounded concurrency, retries and drain."""
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_size: int = 1000,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+    ):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._handlers: dict[str, TaskHandler] = {}
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(max_size)
+        self._workers: list[asyncio.Task] = []
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers) and not self._closing
+
+    def register(self, name: str) -> Callable[[TaskHandler], TaskHandler]:
+        """Registers a coroutine function as the handler of the named job."""
+
+        def decorator(handler: TaskHandler) -> TaskHandler:
+            self._handlers[name] = handler
+            return handler
+
+        return decorator
+
+    async def enqueue(self, name: str, **payload: Any) -> None:
+        """Schedules a job; drops it with a warning if the queue is unavailable."""
+        if name not in self._handlers:
+            raise ValueError(f"No handler registered for job '{name}'")
+        if not self.running:
+            logger.warning("Task queue is not running, job '%s' dropped", name)
+            return
+        try:
+            self._queue.put_nowait(Job(name=name, payload=payload))
+        except asyncio.QueueFull:
+            logger.warning("Task queue is full, job '%s' dropped", name)
+
+    def start(self) -> None:
+        """Starts the worker tasks."""
+        if self._workers:
+            return
+        self._closing = False
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """Stops accepting jobs, waits for queued ones and stops the workers."""
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Task queue drain timed out, %d job(s) abandoned", self._queue.qsize()
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> bool:
+        """Runs a job, retrying it with exponential backoff. Returns success."""
+        handler = self._handlers[job.name]
+        while True:
+            job.attempts += 1
+            try:
+                await handler(**job.payload)
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if job.attempts > self.max_retries:
+                    logger.exception(
+                        "Job '%s' failed after %d attempt(s)", job.name, job.attempts
+                    )
+                    return False
+                logger.warning(
+                    "Job '%s' failed, retrying (attempt %d)", job.name, job.attempts
+                )
+                await asyncio.sleep(self.retry_delay * 2 ** (job.attempts - 1))
+
+
+class DurableTaskQueue(TaskQueue):
+    """Task queue persisted in the background_jobs table.
+
+    Workers claim jobs with FOR UPDATE SKIP LOCKED, so several processes can
+    share the table; jobs left running by a crashed worker are reclaimed after
+    lock_timeout seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+        poll_interval: float = 1.0,
+        lock_timeout: float = 300.0,
+    ):
+        super().__init__(
+            concurrency=concurrency, max_retries=max_retries, retry_delay=retry_delay
+        )
+        self._session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.lock_timeout = lock_timeout
+        self._wakeup = asyncio.Event()
+        self._active = 0
+
+    @property
+    def session_factory(self):
+        return self._session_factory or db.get_session_factory()
+
+    async def enqueue(self, name: str, **payload: Any) -> None:
+        """Stores a job in the database; it survives restarts until completed."""
+        if name not in self._handlers:
+            raise ValueError(f"No handler registered for job '{name}'")
+        async with self.session_factory() as session:
+            session.add(models.BackgroundJob(name=name, payload=payload))
+            await session.commit()
+        self._wakeup.set()
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """Stops claiming new jobs and waits for the running ones to finish."""
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*self._workers, return_exceptions=True), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Task queue drain timed out, %d job(s) left", self._active)
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        while not self._closing:
+            job = await self._claim()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._active += 1
+            try:
+                await self._run_durable(job)
+            finally:
+                self._active -= 1
+
+    async def _claim(self) -> Job | None:
+        """Atomically marks the oldest available job as running."""
+        now = datetime.now(timezone.utc)
+        jobs = models.BackgroundJob
+        available = (
+            select(jobs.id)
+            .where(
+                (jobs.status == "pending") & (jobs.run_after <= now)
+                | (jobs.status == "running")
+                & (jobs.locked_at < now - timedelta(seconds=self.lock_timeout))
+            )
+            .order_by(jobs.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(jobs)
+                .where(jobs.id == available)
+                .values(status="running", locked_at=now, attempts=jobs.attempts + 1)
+                .returning(jobs.id, jobs.name, jobs.payload, jobs.attempts)
+            )
+            row = result.one_or_none()
+            await session.commit()
+        if row is None:
+            return None
+        return Job(id=row.id, name=row.name, payload=row.payload, attempts=row.attempts)
+
+    async def _run_durable(self, job: Job) -> None:
+        handler = self._handlers.get(job.name)
+        error = None
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job '{job.name}'")
+            await handler(**job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Job '%s' (id=%s) failed", job.name, job.id)
+            error = repr(e)
+
+        jobs = models.BackgroundJob
+        async with self.session_factory() as session:
+            if error is None:
+                await session.execute(delete(jobs).where(jobs.id == job.id))
+            elif job.attempts > self.max_retries:
+                await session.execute(
+                    update(jobs)
+                    .where(jobs.id == job.id)
+                    .values(status="failed", last_error=error)
+                )
+            else:
+                delay = self.retry_delay * 2 ** (job.attempts - 1)
+                await session.execute(
+                    update(jobs)
+                    .where(jobs.id == job.id)
+                    .values(
+                        status="pending",
+                        last_error=error,
+                        run_after=datetime.now(timezone.utc) + timedelta(seconds=delay),
+                    )
+                )
+            await session.commit()
+
+
+def create_task_queue() -> TaskQueue:
+    if settings.TASK_QUEUE_DURABLE:
+        return DurableTaskQueue(
+            concurrency=settings.TASK_QUEUE_CONCURRENCY,
+            max_retries=settings.TASK_QUEUE_MAX_RETRIES,
+        )
+    return TaskQueue(
+        concurrency=settings.TASK_QUEUE_CONCURRENCY,
+        max_size=settings.TASK_QUEUE_MAX_SIZE,
+        max_retries=settings.TASK_QUEUE_MAX_RETRIES,
+    )
+
+
+task_queue = create_task_queue()
+
+
+def get_task_queue() -> TaskQueue:
+    return task_queue
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+T = TypeVar("T")
+
+# SQLSTATE query_canceled: statement_timeout або скасування запиту
+QUERY_CANCELED = "57014"
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_query(
+    request: Request,
+    query: Awaitable[T],
+    timeout: float,
+    session: AsyncSession | None = None,
+) -> T:
+    """Runs DB work, cancelling it on timeout or when the client disconnects.
+
+    Cancelling the task makes asyncpg send a cancel request for the running
+    statement, so an abandoned query stops holding its connection. The
+    session's connection is then invalidated rather than returned to the
+    pool mid-cancel. Use for routes whose request body is already read.
+    """
+    task = asyncio.ensure_future(query)
+    watcher = asyncio.create_task(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait(
+            {task, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        watcher.cancel()
+
+    if task in done:
+        return task.result()
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    if session is not None:
+        await session.invalidate()
+    if watcher in done:
+        raise HTTPException(status_code=499, detail="Client closed request")
+    raise HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Query timed out"
+    )
+
+
+async def query_canceled_handler(request: Request, exc: DBAPIError):
+    """Turns statement_timeout cancellations into 504 instead of 500."""
+    if getattr(exc.orig, "sqlstate", None) != QUERY_CANCELED:
+        raise exc
+    return JSONResponse(
+        {"detail": "Query timed out"},
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        headers={"Retry-After": "1"},
+    )
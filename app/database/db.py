@@ -1,17 +1,95 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from starlette.requests import Request
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
+# Рушій створюється ліниво (або в lifespan застосунку), а не під час імпорту
+engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker | None = None
+ReadSessionLocal: async_sessionmaker | None = None
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine, autocommit=False, autoflush=False, expire_on_commit=False
-)
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
 
 
-async def get_db():
-    db = AsyncSessionLocal()
+def init_engine(url: str | None = None, **kwargs) -> AsyncEngine:
+    """Creates the engine and session factory, replacing existing ones."""
+    global engine, AsyncSessionLocal, ReadSessionLocal
+
+    options = {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "connect_args": {
+            "server_settings": {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+            }
+        },
+    }
+    options.update(kwargs)
+    engine = create_async_engine(url or settings.DATABASE_URL, **options)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=engine, autocommit=False, autoflush=False, expire_on_commit=False
+    )
+    # Читання без BEGIN/ROLLBACK: кожен запит виконується у власній транзакції
+    ReadSessionLocal = async_sessionmaker(
+        bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    if engine is None:
+        init_engine()
+    return engine
+
+
+def get_session_factory() -> async_sessionmaker:
+    if AsyncSessionLocal is None:
+        init_engine()
+    return AsyncSessionLocal
+
+
+def get_read_session_factory() -> async_sessionmaker:
+    """Sessions in autocommit mode, for requests that only read."""
+    if ReadSessionLocal is None:
+        init_engine()
+    return ReadSessionLocal
+
+
+async def dispose_engine() -> None:
+    global engine, AsyncSessionLocal, ReadSessionLocal
+
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    AsyncSessionLocal = None
+    ReadSessionLocal = None
+
+
+async def get_db(request: Request):
+    """Yields the session of the request.
+
+    FastAPI resolves the dependency once per request, so the user lookup and
+    the services share one session; it checks out a connection only at its
+    first query. Read-only methods get an autocommit session, which skips
+    the BEGIN/ROLLBACK round trips around their queries.
+    """
+    if request.method in READ_ONLY_METHODS:
+        db = get_read_session_factory()()
+    else:
+        db = get_session_factory()()
     try:
         yield db
     finally:
         await db.close()
+
+
+def pool_usage() -> float:
+    """Share of the connection pool (including overflow) currently checked out."""
+    if engine is None:
+        return 0.0
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    return engine.pool.checkedout() / capacity
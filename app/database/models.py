@@ -1,8 +1,11 @@
 import uuid
 import secrets
 import string
+from decimal import Decimal
+from typing import NamedTuple
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -10,12 +13,14 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Enum,
+    Index,
+    UniqueConstraint,
     select,
 )
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.database.base import Base
 
 
@@ -41,7 +46,14 @@ class Receipt(Base):
     payment_amount = Column(Numeric(10, 2), nullable=False)
     total = Column(Numeric(10, 2), nullable=False)
     rest = Column(Numeric(10, 2), nullable=False, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Денормалізований знімок товарів, щоб читати чек одним рядком
+    products_snapshot = Column(JSONB, nullable=True)
+    # Ті самі суми в копійках (MONEY_MODE=minor). Застосунок пише лише колонки
+    # свого режиму, тригер receipts_fill_money доповнює інші під час INSERT
+    payment_amount_minor = Column(BigInteger, nullable=True)
+    total_minor = Column(BigInteger, nullable=True)
+    rest_minor = Column(BigInteger, nullable=True)
 
     user = relationship("User", back_populates="receipts")
     products = relationship("Product", back_populates="receipt")
@@ -49,15 +61,70 @@ class Receipt(Base):
         "ShortLink", back_populates="receipt", uselist=False, lazy="joined"
     )
 
+    @staticmethod
+    def build_products_snapshot(products: list["Product"]) -> list[dict]:
+        """Builds a JSON snapshot of product lines (money kept as strings)."""
+        return [
+            {
+                "name": p.name,
+                "price": f"{p.price:.2f}",
+                "quantity": f"{p.quantity:.2f}",
+            }
+            for p in products
+        ]
+
+    @property
+    def product_lines(self) -> list["ProductLine"] | list["Product"]:
+        """Product lines from the snapshot, falling back to the products table."""
+        if self.products_snapshot is None:
+            return self.products
+        return [
+            (
+                ProductLine(
+                    name=p["name"],
+                    price=Decimal(p["price"]),
+                    quantity=Decimal(p["quantity"]),
+                )
+                if "price" in p
+                # Знімки, записані в режимі MONEY_MODE=minor, мають лише копійки
+                else ProductLine(
+                    name=p["name"],
+                    price=Decimal(p["price_minor"]).scaleb(-2),
+                    quantity=Decimal(p["quantity_minor"]).scaleb(-2),
+                )
+            )
+            for p in self.products_snapshot
+        ]
+
+
+class ProductLine(NamedTuple):
+    """A read-only product line restored from a receipt snapshot."""
+
+    name: str
+    price: Decimal
+    quantity: Decimal
+
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Триграмний індекс для пошуку ILIKE '%...%' по назві товару
+        Index(
+            "ix_products_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    receipt_id = Column(UUID(as_uuid=True), ForeignKey("receipts.id"))
+    receipt_id = Column(UUID(as_uuid=True), ForeignKey("receipts.id"), index=True)
     name = Column(String, nullable=False)
     price = Column(Numeric(10, 2), nullable=False)
     quantity = Column(Numeric(10, 2), nullable=False)
+    # Доповнюються тригером products_fill_money, як і в receipts
+    price_minor = Column(BigInteger, nullable=True)
+    quantity_minor = Column(BigInteger, nullable=True)
 
     receipt = relationship("Receipt", back_populates="products")
 
@@ -83,14 +150,91 @@ class ShortLink(Base):
     async def create_short_link(
         cls, db: "AsyncSession", receipt_id: UUID
     ) -> "ShortLink":
-        """Creates a short link for a receipt."""
+        """Creates a short link for a receipt within the current transaction.
+
+        Codes of archived receipts stay taken: their short_links rows are
+        deleted, but the public endpoint still serves them from the archive.
+        """
         while True:
             short_code = cls.generate_short_code()
             short_link = cls(receipt_id=receipt_id, short_code=short_code)
-            db.add(short_link)
+            # Savepoint: при колізії коду відкочуємо лише вставку посилання
             try:
-                await db.commit()
-                await db.refresh(short_link)
+                async with db.begin_nested() as savepoint:
+                    db.add(short_link)
+                    await db.flush()
+                    # Перевіряємо після вставки: якщо архівація цього коду
+                    # паралельна, вставка дочекається її коміту
+                    archived = await db.scalar(
+                        select(ArchivedReceipt.short_code).where(
+                            ArchivedReceipt.short_code == short_code
+                        )
+                    )
+                    if archived is not None:
+                        await savepoint.rollback()
+                        continue
                 return short_link
             except IntegrityError:
-                await db.rollback()
+                continue
+
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        Index("ix_background_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    name = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(
+        Enum("pending", "running", "failed", name="background_job_status_enum"),
+        nullable=False,
+        default="pending",
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    key = Column(String, nullable=False)
+    request_hash = Column(String, nullable=False)
+    receipt_id = Column(UUID(as_uuid=True), ForeignKey("receipts.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ArchivedReceipt(Base):
+    """Index of receipts moved to archive segment files, by short code."""
+
+    __tablename__ = "archived_receipts"
+
+    short_code = Column(String, primary_key=True)
+    receipt_id = Column(UUID(as_uuid=True), unique=True, nullable=False)
+    user_id = Column(UUID(as_uuid=True), index=True)
+    segment = Column(String, nullable=False)
+    segment_offset = Column(BigInteger, nullable=False)
+    record_length = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+
+
+class ShortCodeBlock(Base):
+    """A range of short codes reserved by an offline till."""
+
+    __tablename__ = "short_code_blocks"
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
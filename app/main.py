@@ -1,16 +1,60 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
-from app.api import users, receipts, public
+from fastapi import APIRouter, FastAPI
+from sqlalchemy.exc import DBAPIError
 
+from app.api import users, receipts, public, sync
+from app.core.broker import broker
+from app.core.cache import get_result_cache
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.rate_limit import AdmissionControlMiddleware
+from app.core.tasks import task_queue
+from app.core.timeouts import query_canceled_handler
+from app.database import db
+from app.services import jobs  # noqa: F401 Register background job handlers
 
-app = FastAPI()
+root_router = APIRouter()
 
 
-@app.get("/")
+@root_router.get("/")
 async def root():
     return {"message": "Checkbox Test Task"}
 
 
-app.include_router(users.router, prefix="/users", tags=["users"])
-app.include_router(receipts.router, prefix="/receipts", tags=["receipts"])
-app.include_router(public.router, prefix="/public", tags=["public"])
+@root_router.get("/health/")
+async def health():
+    # Статистика кешу списків чеків цього процесу
+    return {"status": "ok", "result_cache": get_result_cache().stats()}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Підключення до БД створюється при старті, а не при імпорті модулів
+    if db.engine is None:
+        db.init_engine()
+    await broker.start()
+    task_queue.start()
+    yield
+    await task_queue.drain(settings.TASK_QUEUE_DRAIN_TIMEOUT)
+    await broker.stop()
+    await db.dispose_engine()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
+    app.add_exception_handler(DBAPIError, query_canceled_handler)
+    app.add_middleware(AdmissionControlMiddleware)
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE
+    )
+
+    app.include_router(root_router)
+    app.include_router(users.router, prefix="/users", tags=["users"])
+    app.include_router(receipts.router, prefix="/receipts", tags=["receipts"])
+    app.include_router(public.router, prefix="/public", tags=["public"])
+    app.include_router(sync.router, prefix="/sync", tags=["sync"])
+    return app
+
+
+app = create_app()
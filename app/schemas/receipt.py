@@ -1,9 +1,9 @@
 import uuid
-from typing import List
-from datetime import datetime
+from typing import List, Literal
+from datetime import date, datetime
 from enum import Enum
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import AwareDatetime, BaseModel, Field, field_validator
 
 
 class PaymentType(str, Enum):
@@ -46,3 +46,51 @@ class Receipt(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class ReceiptFilters(BaseModel):
+    start_date: date | None = None
+    end_date: date | None = None
+    min_amount: float | None = None
+    max_amount: float | None = None
+    payment_type: PaymentType | None = None
+
+
+class ReceiptSearchResult(BaseModel):
+    receipt: Receipt
+    highlights: List[str]
+
+
+class ShortCodeBlock(BaseModel):
+    block_id: int
+    size: int
+
+
+class SyncReceipt(ReceiptCreate):
+    id: uuid.UUID
+    short_code: str
+    created_at: AwareDatetime
+
+
+class SyncBatch(BaseModel):
+    receipts: List[SyncReceipt] = Field(..., max_length=500)
+
+
+class SyncRejection(BaseModel):
+    id: uuid.UUID
+    reason: str
+
+
+class SyncAck(BaseModel):
+    acked: List[uuid.UUID]
+    rejected: List[SyncRejection]
+
+
+class PublicBatchRequest(BaseModel):
+    short_codes: List[str] = Field(..., min_length=1, max_length=100)
+    locale: Literal["uk", "en"] = "uk"
+
+
+class PublicBatchItem(BaseModel):
+    short_code: str
+    text: str | None
@@ -0,0 +1,195 @@
+import calendar
+import json
+import mmap
+import os
+import uuid
+import zlib
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Sequence
+
+from sqlalchemy import String, any_, bindparam, delete, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, selectinload
+
+from app.core.cache import invalidate_receipts
+from app.core.config import settings
+from app.database import models
+
+
+def months_ago(months: int, now: datetime | None = None) -> datetime:
+    """Returns the same moment N calendar months earlier (day clamped to month end)."""
+    now = now or datetime.now(timezone.utc)
+    year, month = divmod(now.year * 12 + now.month - 1 - months, 12)
+    day = min(now.day, calendar.monthrange(year, month + 1)[1])
+    return now.replace(year=year, month=month + 1, day=day)
+
+
+class SegmentReader:
+    """Reads archived records from memory-mapped segment files.
+
+    Segments are immutable once written, so each one is mapped once and kept
+    open for the lifetime of the process.
+    """
+
+    def __init__(self):
+        self._maps: dict[Path, mmap.mmap] = {}
+
+    def read(self, path: Path, offset: int, length: int) -> dict:
+        segment = self._maps.get(path)
+        if segment is None:
+            with open(path, "rb") as f:
+                segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[path] = segment
+        return json.loads(zlib.decompress(segment[offset : offset + length]))
+
+
+segment_reader = SegmentReader()
+
+
+class ArchiveService:
+    """Moves old receipts into compressed segment files and reads them back.
+
+    A segment is a sequence of zlib-compressed JSON records, one per receipt;
+    records are compressed separately so a single receipt can be read by
+    offset. The archived_receipts table maps short codes to those offsets.
+    """
+
+    def __init__(self, db: AsyncSession, archive_dir: str | Path | None = None):
+        self.db = db
+        self.archive_dir = Path(archive_dir or settings.ARCHIVE_DIR)
+
+    async def archive_before(self, cutoff: datetime, batch_size: int = 10_000) -> int:
+        """Archives one batch of receipts created before cutoff. Returns its size.
+
+        The archive is keyed by short code, so receipts without a short link
+        are left in place.
+        """
+        result = await self.db.execute(
+            select(models.Receipt)
+            .join(models.Receipt.short_link)
+            .where(models.Receipt.created_at < cutoff)
+            .order_by(models.Receipt.created_at)
+            .limit(batch_size)
+            .options(
+                contains_eager(models.Receipt.short_link),
+                selectinload(models.Receipt.products),
+            )
+        )
+        receipts = result.scalars().all()
+        if not receipts:
+            return 0
+
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        segment = f"receipts-{timestamp}-{uuid.uuid4().hex[:8]}.seg"
+        index_rows = self._write_segment(segment, receipts)
+
+        # Сегмент уже на диску, тож індекс і видалення - в одній транзакції
+        receipt_ids = [r.id for r in receipts]
+        self.db.add_all(index_rows)
+        for model in (models.IdempotencyKey, models.Product, models.ShortLink):
+            await self.db.execute(
+                delete(model).where(model.receipt_id.in_(receipt_ids))
+            )
+        await self.db.execute(
+            delete(models.Receipt).where(models.Receipt.id.in_(receipt_ids))
+        )
+        try:
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            (self.archive_dir / segment).unlink(missing_ok=True)
+            raise
+        await invalidate_receipts(*{r.user_id for r in receipts})
+        return len(receipts)
+
+    def _write_segment(
+        self, segment: str, receipts: list[models.Receipt]
+    ) -> list[models.ArchivedReceipt]:
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        path = self.archive_dir / segment
+        tmp_path = path.with_suffix(".tmp")
+
+        index_rows = []
+        offset = 0
+        with open(tmp_path, "wb") as f:
+            for receipt in receipts:
+                record = zlib.compress(
+                    json.dumps(self._to_record(receipt), ensure_ascii=False).encode()
+                )
+                f.write(record)
+                index_rows.append(
+                    models.ArchivedReceipt(
+                        short_code=receipt.short_link.short_code,
+                        receipt_id=receipt.id,
+                        user_id=receipt.user_id,
+                        segment=segment,
+                        segment_offset=offset,
+                        record_length=len(record),
+                        created_at=receipt.created_at,
+                    )
+                )
+                offset += len(record)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return index_rows
+
+    @staticmethod
+    def _to_record(receipt: models.Receipt) -> dict:
+        products = receipt.products_snapshot
+        if products is None:
+            products = models.Receipt.build_products_snapshot(receipt.products)
+        return {
+            "id": str(receipt.id),
+            "user_id": str(receipt.user_id),
+            "payment_type": receipt.payment_type,
+            "payment_amount": str(receipt.payment_amount),
+            "total": str(receipt.total),
+            "rest": str(receipt.rest),
+            "created_at": receipt.created_at.isoformat(),
+            "short_code": receipt.short_link.short_code,
+            "products": products,
+        }
+
+    async def get_archived_receipt(self, short_code: str) -> models.Receipt | None:
+        """Restores an archived receipt (detached from the session) by short code."""
+        receipts = await self.get_archived_receipts([short_code])
+        return receipts.get(short_code)
+
+    async def get_archived_receipts(
+        self, short_codes: Sequence[str]
+    ) -> dict[str, models.Receipt]:
+        """Restores archived receipts by short codes with one index query."""
+        result = await self.db.execute(
+            select(models.ArchivedReceipt).where(
+                models.ArchivedReceipt.short_code
+                == any_(bindparam("short_codes", list(short_codes), ARRAY(String)))
+            )
+        )
+        return {
+            entry.short_code: self._from_record(
+                segment_reader.read(
+                    self.archive_dir / entry.segment,
+                    entry.segment_offset,
+                    entry.record_length,
+                )
+            )
+            for entry in result.scalars()
+        }
+
+    @staticmethod
+    def _from_record(record: dict) -> models.Receipt:
+        return models.Receipt(
+            id=uuid.UUID(record["id"]),
+            user_id=uuid.UUID(record["user_id"]),
+            payment_type=record["payment_type"],
+            payment_amount=Decimal(record["payment_amount"]),
+            total=Decimal(record["total"]),
+            rest=Decimal(record["rest"]),
+            created_at=datetime.fromisoformat(record["created_at"]),
+            products_snapshot=record["products"],
+            short_link=models.ShortLink(short_code=record["short_code"]),
+        )
@@ -0,0 +1,13 @@
+import logging
+
+from app.core.broker import broker
+from app.core.tasks import task_queue
+
+logger = logging.getLogger(__name__)
+
+
+@task_queue.register("receipt_created")
+async def receipt_created(receipt_id: str, user_id: str) -> None:
+    """Post-create work for a receipt, run outside of the request."""
+    logger.info("Receipt %s created by user %s", receipt_id, user_id)
+    await broker.publish(user_id, receipt_id)
@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
+
+from app.core.config import settings
+from app.database import models
+from app.services.money import (
+    receipt_minor_amounts,
+    receipt_minor_lines,
+    round_half_even,
+)
+
+
+@dataclass(frozen=True)
+class ReceiptLocale:
+    total: str
+    rest: str
+    payment_types: dict[str, str]
+    thanks: str
+    date_format: str
+
+
+LOCALES = {
+    "uk": ReceiptLocale(
+        total="СУМА",
+        rest="Решта",
+        payment_types={"cash": "Готівка", "cashless": "Картка"},
+        thanks="Дякуємо за покупку!",
+        date_format="%d.%m.%Y %H:%M",
+    ),
+    "en": ReceiptLocale(
+        total="TOTAL",
+        rest="Change",
+        payment_types={"cash": "Cash", "cashless": "Card"},
+        thanks="Thank you for your purchase!",
+        date_format="%Y-%m-%d %H:%M",
+    ),
+}
+
+
+class ReceiptLayout:
+    """Fixed-width receipt template compiled for one line length and locale.
+
+    Everything that does not depend on a receipt (header, rules, padded
+    labels, format strings) is built once; rendering only formats amounts
+    and joins the parts.
+    """
+
+    def __init__(self, line_length: int, locale: str):
+        self.line_length = line_length
+        self.locale = LOCALES[locale]
+        self._center = f"{{:^{line_length}}}".format
+
+        double_rule = "=" * line_length
+        self._head = [self._center(settings.RECEIPT_HEADER), double_rule]
+        self._separator = "-" * line_length
+        self._double_rule = double_rule
+        self._total_label = self.locale.total
+        self._rest_label = self.locale.rest
+        self._thanks = self._center(self.locale.thanks)
+
+    def _wrap(self, name: str) -> list[str]:
+        n = self.line_length
+        # Довгу назву переносимо на кілька рядків по line_length символів
+        return [name[i : i + n].ljust(n) for i in range(0, len(name), n)]
+
+    def _align(self, left: str, right: str) -> str:
+        # Праве значення притиснуте до краю, але хоча б один пробіл між ними
+        return f"{left} {right.rjust(self.line_length - len(left) - 1)}"
+
+    def render(self, receipt: models.Receipt) -> str:
+        if settings.MONEY_MODE == "minor":
+            return self.render_minor(receipt)
+        parts = self._head.copy()
+
+        for i, product in enumerate(receipt.product_lines):
+            if i:
+                parts.append(self._separator)
+            parts.extend(self._wrap(product.name))
+            total_price = round(product.quantity * product.price, 2)
+            parts.append(
+                self._align(
+                    f"{product.quantity:4.2f} x {product.price:6.2f} =",
+                    f"{total_price:7.2f}",
+                )
+            )
+
+        return self._finish(
+            parts,
+            receipt,
+            f"{float(receipt.total):9.2f}",
+            f"{float(receipt.payment_amount):9.2f}",
+            f"{float(receipt.rest):9.2f}",
+        )
+
+    def render_minor(self, receipt: models.Receipt) -> str:
+        """Renders from integer kopecks; the text is identical to render().
+
+        k / 100 is the float nearest to the exact amount, so formatting it
+        with two decimals prints exactly k kopecks.
+        """
+        parts = self._head.copy()
+
+        for i, line in enumerate(receipt_minor_lines(receipt)):
+            if i:
+                parts.append(self._separator)
+            parts.extend(self._wrap(line.name))
+            # round() у render() округлює Decimal до парного
+            total_price = round_half_even(line.quantity * line.price, 100)
+            parts.append(
+                self._align(
+                    f"{line.quantity / 100:4.2f} x {line.price / 100:6.2f} =",
+                    f"{total_price / 100:7.2f}",
+                )
+            )
+
+        payment_amount, total, rest = receipt_minor_amounts(receipt)
+        return self._finish(
+            parts,
+            receipt,
+            f"{total / 100:9.2f}",
+            f"{payment_amount / 100:9.2f}",
+            f"{rest / 100:9.2f}",
+        )
+
+    def _finish(
+        self,
+        parts: list[str],
+        receipt: models.Receipt,
+        total: str,
+        payment_amount: str,
+        rest: str,
+    ) -> str:
+        payment_type = self.locale.payment_types[receipt.payment_type]
+        parts += (
+            self._double_rule,
+            self._align(self._total_label, total),
+            self._align(payment_type, payment_amount),
+            self._align(self._rest_label, rest),
+            self._double_rule,
+            self._center(receipt.created_at.strftime(self.locale.date_format)),
+            self._thanks,
+        )
+        return "\n".join(parts)
+
+
+@lru_cache(maxsize=64)
+def get_layout(line_length: int, locale: str = "uk") -> ReceiptLayout:
+    """Returns the compiled layout, building it on first use."""
+    return ReceiptLayout(line_length, locale)
+
+
+def render_receipts(
+    receipts: Iterable[models.Receipt], line_length: int, locale: str = "uk"
+) -> list[str]:
+    """Renders many receipts with one compiled layout."""
+    layout = get_layout(line_length, locale)
+    return [layout.render(receipt) for receipt in receipts]
@@ -0,0 +1,141 @@
+"""Money as integer minor units (kopecks), used when MONEY_MODE is "minor".
+
+Amounts are parsed once at the edge into ints, all arithmetic is integer,
+and they are turned back into strings or floats only for output. Results
+match the Decimal path in app.services.totals exactly.
+"""
+
+from decimal import Decimal
+from typing import Iterable, NamedTuple
+
+from app.database import models
+from app.schemas import receipt as receipt_schemas
+from app.services.totals import to_money
+
+
+class MinorLine(NamedTuple):
+    name: str
+    price: int
+    # Кількість у сотих частках, як у Numeric(10, 2)
+    quantity: int
+
+
+def to_minor(value: float | Decimal | str) -> int:
+    """Converts a number to hundredths, rounding half up like to_money()."""
+    text = str(value)
+    if "e" in text or "E" in text:
+        return int(to_money(value).scaleb(2))
+    negative = text.startswith("-")
+    whole, _, fraction = text.lstrip("+-").partition(".")
+    fraction = (fraction + "000")[:3]
+    minor = int(whole or 0) * 100 + int(fraction[:2])
+    # Половина і більше - вгору, решта цифр уже не впливає на ROUND_HALF_UP
+    if fraction[2] >= "5":
+        minor += 1
+    return -minor if negative else minor
+
+
+def format_minor(minor: int) -> str:
+    """Formats hundredths as a number with two decimals, e.g. 1234 -> "12.34"."""
+    sign = "-" if minor < 0 else ""
+    whole, cents = divmod(abs(minor), 100)
+    return f"{sign}{whole}.{cents:02d}"
+
+
+def round_half_up(value: int, divisor: int) -> int:
+    quotient, remainder = divmod(abs(value), divisor)
+    if remainder * 2 >= divisor:
+        quotient += 1
+    return -quotient if value < 0 else quotient
+
+
+def round_half_even(value: int, divisor: int) -> int:
+    quotient, remainder = divmod(abs(value), divisor)
+    if remainder * 2 > divisor or remainder * 2 == divisor and quotient % 2:
+        quotient += 1
+    return -quotient if value < 0 else quotient
+
+
+def _exact(value: float | Decimal | str) -> tuple[int, int]:
+    """Splits a number into an integer and its count of decimals, exactly."""
+    text = str(value)
+    if "e" in text or "E" in text:
+        sign, digits, exponent = Decimal(text).as_tuple()
+        mantissa = int("".join(map(str, digits)) or 0)
+        if exponent > 0:
+            mantissa, exponent = mantissa * 10**exponent, 0
+        return (-mantissa if sign else mantissa), -exponent
+    whole, _, fraction = text.partition(".")
+    return int(whole + fraction), len(fraction)
+
+
+def calculate_totals_minor(
+    products: Iterable[receipt_schemas.ProductBase], payment_amount: int
+) -> tuple[int, int]:
+    """Returns the total and the rest in kopecks.
+
+    Like calculate_totals(), multiplies the exact price and quantity of each
+    line (not the values rounded for storage), sums them at a common scale
+    and rounds once.
+    """
+    exact, scale = 0, 0
+    for p in products:
+        price, price_decimals = _exact(p.price)
+        quantity, quantity_decimals = _exact(p.quantity)
+        line, decimals = price * quantity, price_decimals + quantity_decimals
+        if decimals > scale:
+            exact *= 10 ** (decimals - scale)
+            scale = decimals
+        else:
+            line *= 10 ** (scale - decimals)
+        exact += line
+
+    if scale > 2:
+        total = round_half_up(exact, 10 ** (scale - 2))
+    else:
+        total = exact * 10 ** (2 - scale)
+    rest = payment_amount - total if payment_amount else 0
+    return total, rest
+
+
+def minor_products_snapshot(lines: list[MinorLine]) -> list[dict]:
+    """Snapshot of product lines with money in minor units only.
+
+    Receipt.product_lines converts them back for the decimal mode.
+    """
+    return [
+        {"name": line.name, "price_minor": line.price, "quantity_minor": line.quantity}
+        for line in lines
+    ]
+
+
+def receipt_minor_lines(receipt: models.Receipt) -> list[MinorLine]:
+    """Product lines of a stored receipt in minor units."""
+    snapshot = receipt.products_snapshot
+    if snapshot is None:
+        return [
+            MinorLine(p.name, p.price_minor, p.quantity_minor) for p in receipt.products
+        ]
+    return [
+        MinorLine(
+            p["name"],
+            p["price_minor"] if "price_minor" in p else to_minor(p["price"]),
+            p["quantity_minor"] if "quantity_minor" in p else to_minor(p["quantity"]),
+        )
+        for p in snapshot
+    ]
+
+
+def receipt_minor_amounts(receipt: models.Receipt) -> tuple[int, int, int]:
+    """(payment_amount, total, rest) of a stored receipt in minor units.
+
+    Archived receipts have no minor columns and fall back to converting the
+    Numeric values.
+    """
+    if receipt.total_minor is not None:
+        return receipt.payment_amount_minor, receipt.total_minor, receipt.rest_minor
+    return (
+        to_minor(receipt.payment_amount),
+        to_minor(receipt.total),
+        to_minor(receipt.rest),
+    )
@@ -1,90 +1,213 @@
+from collections import defaultdict
+import hashlib
 from typing import Sequence
 
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache import invalidate_receipts
+from app.core.config import settings
+from app.core.tasks import TaskQueue
 from app.database import models
 from app.schemas import receipt as receipt_schemas
+from app.services.archive import ArchiveService
+from app.services.money import (
+    MinorLine,
+    calculate_totals_minor,
+    minor_products_snapshot,
+    to_minor,
+)
+from app.services.totals import calculate_totals, to_money
 from app.database.models import ShortLink
 from datetime import date
-from sqlalchemy import and_, select
+from sqlalchemy import Select, String, and_, any_, bindparam, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+import html
+import re
 import uuid
 
 
 class ReceiptService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, task_queue: TaskQueue | None = None):
         self.db = db
+        self.task_queue = task_queue
 
     async def create_receipt(
-        self, receipt: receipt_schemas.ReceiptCreate, user_id: uuid.UUID
+        self,
+        receipt: receipt_schemas.ReceiptCreate,
+        user_id: uuid.UUID,
+        idempotency_key: str | None = None,
+    ) -> models.Receipt:
+        """Creates a new receipt, or returns the one already created for the key."""
+        key_id = None
+        if idempotency_key:
+            request_hash = hashlib.sha256(
+                receipt.model_dump_json().encode()
+            ).hexdigest()
+            # Конкурентний запит з тим самим ключем чекає тут на коміт першого
+            result = await self.db.execute(
+                insert(models.IdempotencyKey)
+                .values(user_id=user_id, key=idempotency_key, request_hash=request_hash)
+                .on_conflict_do_nothing(index_elements=["user_id", "key"])
+                .returning(models.IdempotencyKey.id)
+            )
+            key_id = result.scalar_one_or_none()
+            if key_id is None:
+                return await self._get_idempotent_receipt(
+                    user_id, idempotency_key, request_hash
+                )
+
+        db_receipt = self.build_receipt(receipt, user_id)
+        self.db.add(db_receipt)
+        await self.db.flush()
+
+        short_link = await ShortLink.create_short_link(
+            db=self.db, receipt_id=db_receipt.id
+        )
+        db_receipt.short_link = short_link
+
+        if key_id is not None:
+            await self.db.execute(
+                update(models.IdempotencyKey)
+                .where(models.IdempotencyKey.id == key_id)
+                .values(receipt_id=db_receipt.id)
+            )
+
+        # Чек, товари та коротке посилання фіксуються однією транзакцією
+        await self.db.commit()
+        await invalidate_receipts(user_id)
+
+        if self.task_queue:
+            await self.task_queue.enqueue(
+                "receipt_created",
+                receipt_id=str(db_receipt.id),
+                user_id=str(db_receipt.user_id),
+            )
+
+        return db_receipt
+
+    @staticmethod
+    def build_receipt(
+        receipt: receipt_schemas.ReceiptCreate, user_id: uuid.UUID, **fields
     ) -> models.Receipt:
-        """Creates a new receipt."""
+        """Builds a receipt with its products and totals (not added to a session).
+
+        Only the money columns of the current MONEY_MODE are set; a trigger
+        fills the other set on INSERT.
+        """
+        if settings.MONEY_MODE == "minor":
+            return ReceiptService._build_receipt_minor(receipt, user_id, **fields)
+
         products = [
-            models.Product(name=p.name, price=p.price, quantity=p.quantity)
+            models.Product(
+                name=p.name, price=to_money(p.price), quantity=to_money(p.quantity)
+            )
             for p in receipt.products
         ]
+        total, rest = calculate_totals(receipt)
 
-        total = sum(product.price * product.quantity for product in products)
-
-        db_receipt = models.Receipt(
+        return models.Receipt(
             user_id=user_id,
             payment_type=receipt.payment.type,
-            payment_amount=receipt.payment.amount,
+            payment_amount=to_money(receipt.payment.amount),
             total=total,
-            rest=(receipt.payment.amount - total if receipt.payment.amount else 0),
+            rest=rest,
+            products=products,
+            products_snapshot=models.Receipt.build_products_snapshot(products),
+            **fields,
         )
 
-        self.db.add(db_receipt)
-
-        for product in products:
-            db_receipt.products.append(product)
+    @staticmethod
+    def _build_receipt_minor(
+        receipt: receipt_schemas.ReceiptCreate, user_id: uuid.UUID, **fields
+    ) -> models.Receipt:
+        lines = [
+            MinorLine(p.name, to_minor(p.price), to_minor(p.quantity))
+            for p in receipt.products
+        ]
+        payment_amount = to_minor(receipt.payment.amount)
+        total, rest = calculate_totals_minor(receipt.products, payment_amount)
 
-        await self.db.commit()
+        return models.Receipt(
+            user_id=user_id,
+            payment_type=receipt.payment.type,
+            payment_amount_minor=payment_amount,
+            total_minor=total,
+            rest_minor=rest,
+            products=[
+                models.Product(
+                    name=line.name,
+                    price_minor=line.price,
+                    quantity_minor=line.quantity,
+                )
+                for line in lines
+            ],
+            products_snapshot=minor_products_snapshot(lines),
+            **fields,
+        )
 
-        short_link = await ShortLink.create_short_link(
-            db=self.db, receipt_id=db_receipt.id
+    async def _get_idempotent_receipt(
+        self, user_id: uuid.UUID, idempotency_key: str, request_hash: str
+    ) -> models.Receipt:
+        """Returns the receipt stored for an already used idempotency key."""
+        result = await self.db.execute(
+            select(models.IdempotencyKey).where(
+                models.IdempotencyKey.user_id == user_id,
+                models.IdempotencyKey.key == idempotency_key,
+            )
         )
-        db_receipt.short_link = short_link
+        stored_key = result.scalar_one()
+        if stored_key.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request",
+            )
 
-        await self.db.commit()
-        await self.db.refresh(db_receipt, attribute_names=["short_link", "products"])
+        return await self.get_receipt(receipt_id=stored_key.receipt_id, user_id=user_id)
 
-        return db_receipt
+    async def _load_legacy_products(self, receipts: Sequence[models.Receipt]) -> None:
+        """Loads products for receipts created before products snapshots existed."""
+        legacy = {r.id: r for r in receipts if r.products_snapshot is None}
+        if not legacy:
+            return
+
+        result = await self.db.execute(
+            select(models.Product)
+            .where(models.Product.receipt_id.in_(legacy.keys()))
+            .order_by(models.Product.id)
+        )
+        products_by_receipt = defaultdict(list)
+        for product in result.scalars():
+            products_by_receipt[product.receipt_id].append(product)
+
+        for receipt_id, receipt in legacy.items():
+            set_committed_value(receipt, "products", products_by_receipt[receipt_id])
 
     async def get_receipt(
         self, receipt_id: uuid.UUID, user_id: uuid.UUID
     ) -> models.Receipt | None:
-        """Retrieves a receipt by ID for a specific user with eager loading."""
-        query = (
-            select(models.Receipt)
-            .where(
-                and_(models.Receipt.user_id == user_id, models.Receipt.id == receipt_id)
-            )
-            .options(selectinload(models.Receipt.products))
+        """Retrieves a receipt by ID for a specific user."""
+        query = select(models.Receipt).where(
+            and_(models.Receipt.user_id == user_id, models.Receipt.id == receipt_id)
         )
         result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        receipt = result.scalar_one_or_none()
+        if receipt:
+            await self._load_legacy_products([receipt])
+        return receipt
 
-    async def list_receipts(
-        self,
-        user_id: uuid.UUID,
-        skip: int = 0,
-        limit: int = 10,
+    @staticmethod
+    def _apply_filters(
+        query: Select,
         start_date: date | None = None,
         end_date: date | None = None,
         min_amount: float | None = None,
         max_amount: float | None = None,
         payment_type: receipt_schemas.PaymentType | None = None,
-    ) -> Sequence[models.Receipt]:
-        """Retrieves a list of receipts for a user, with pagination and filters."""
-        query = (
-            select(models.Receipt)
-            .where(models.Receipt.user_id == user_id)
-            .options(
-                selectinload(models.Receipt.products),
-            )
-        )
-
+    ) -> Select:
+        """Applies the date, amount and payment type filters to a receipts query."""
         if start_date:
             query = query.where(models.Receipt.created_at >= start_date)
         if end_date:
@@ -95,18 +218,114 @@ class ReceiptService:
             query = query.where(models.Receipt.total <= max_amount)
         if payment_type:
             query = query.where(models.Receipt.payment_type == payment_type)
+        return query
+
+    async def list_receipts(
+        self,
+        user_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 10,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        min_amount: float | None = None,
+        max_amount: float | None = None,
+        payment_type: receipt_schemas.PaymentType | None = None,
+    ) -> Sequence[models.Receipt]:
+        """Retrieves a list of receipts for a user, with pagination and filters."""
+        query = select(models.Receipt).where(models.Receipt.user_id == user_id)
+        query = self._apply_filters(
+            query,
+            start_date=start_date,
+            end_date=end_date,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            payment_type=payment_type,
+        )
 
         query = query.offset(skip).limit(limit)
         result = await self.db.execute(query)
-        return result.scalars().all()
+        receipts = result.scalars().all()
+        await self._load_legacy_products(receipts)
+        return receipts
 
     async def get_receipt_by_short_code(self, short_code: str) -> models.Receipt | None:
-        """Retrieves a receipt by short code."""
+        """Retrieves a receipt by short code, falling back to the archive."""
+        receipts = await self.get_receipts_by_short_codes([short_code])
+        return receipts.get(short_code)
+
+    async def get_receipts_by_short_codes(
+        self, short_codes: Sequence[str]
+    ) -> dict[str, models.Receipt]:
+        """Retrieves receipts by short codes, falling back to the archive.
+
+        Unknown codes are left out of the result.
+        """
         query = (
             select(models.Receipt)
             .join(models.Receipt.short_link)
-            .where(models.ShortLink.short_code == short_code)
-            .options(selectinload(models.Receipt.products))
+            .options(contains_eager(models.Receipt.short_link))
+            .where(
+                models.ShortLink.short_code
+                == any_(bindparam("short_codes", list(short_codes), ARRAY(String)))
+            )
         )
         result = await self.db.execute(query)
-        return result.unique().scalar_one_or_none()
+        receipts = result.scalars().all()
+        await self._load_legacy_products(receipts)
+        found = {receipt.short_link.short_code: receipt for receipt in receipts}
+
+        # Старі чеки перенесені в архів і доступні лише за коротким кодом
+        missing = [code for code in short_codes if code not in found]
+        if missing:
+            found.update(await ArchiveService(self.db).get_archived_receipts(missing))
+        return found
+
+    async def search_receipts(
+        self,
+        user_id: uuid.UUID,
+        q: str,
+        skip: int = 0,
+        limit: int = 10,
+        **filters,
+    ) -> list[tuple[models.Receipt, list[str]]]:
+        """Searches user's receipts by product name and returns them with highlights."""
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", q) + "%"
+        # ILIKE по products.name обслуговується GIN індексом pg_trgm
+        matching = select(models.Product.receipt_id).where(
+            models.Product.name.ilike(pattern, escape="\\")
+        )
+        query = select(models.Receipt).where(
+            models.Receipt.user_id == user_id, models.Receipt.id.in_(matching)
+        )
+        query = self._apply_filters(query, **filters)
+        query = (
+            query.order_by(models.Receipt.created_at.desc()).offset(skip).limit(limit)
+        )
+
+        result = await self.db.execute(query)
+        receipts = result.scalars().all()
+        await self._load_legacy_products(receipts)
+
+        return [
+            (
+                receipt,
+                [
+                    highlight
+                    for p in receipt.product_lines
+                    if (highlight := self.highlight(p.name, q)) is not None
+                ],
+            )
+            for receipt in receipts
+        ]
+
+    @staticmethod
+    def highlight(text: str, q: str, tag: str = "mark") -> str | None:
+        """Wraps case-insensitive matches of q in text with an HTML tag."""
+        parts = re.split(f"({re.escape(q)})", text, flags=re.I)
+        if len(parts) == 1:
+            return None
+        # Непарні частини - збіги, парні - текст між ними
+        return "".join(
+            f"<{tag}>{html.escape(part)}</{tag}>" if i % 2 else html.escape(part)
+            for i, part in enumerate(parts)
+        )
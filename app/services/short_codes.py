@@ -0,0 +1,43 @@
+import string
+
+ALPHABET = string.digits + string.ascii_letters
+BLOCK_PREFIX_LENGTH = 6
+BLOCK_INDEX_LENGTH = 4
+MAX_BLOCK_SIZE = len(ALPHABET) ** BLOCK_INDEX_LENGTH
+# Випадкові коди мають 8 символів, тож коди з блоків ніколи з ними не збігаються
+OFFLINE_CODE_LENGTH = BLOCK_PREFIX_LENGTH + BLOCK_INDEX_LENGTH
+
+
+def encode_base62(value: int, width: int) -> str:
+    chars = []
+    rest = value
+    while rest:
+        rest, remainder = divmod(rest, len(ALPHABET))
+        chars.append(ALPHABET[remainder])
+    if len(chars) > width:
+        raise ValueError(f"{value} does not fit into {width} base62 characters")
+    return "".join(reversed(chars)).rjust(width, ALPHABET[0])
+
+
+def decode_base62(value: str) -> int:
+    result = 0
+    for char in value:
+        result = result * len(ALPHABET) + ALPHABET.index(char)
+    return result
+
+
+def offline_short_code(block_id: int, index: int) -> str:
+    """Short code number `index` of a pre-allocated block."""
+    return encode_base62(block_id, BLOCK_PREFIX_LENGTH) + encode_base62(
+        index, BLOCK_INDEX_LENGTH
+    )
+
+
+def parse_offline_short_code(code: str) -> tuple[int, int] | None:
+    """Returns (block_id, index) of a block short code, or None if malformed."""
+    if len(code) != OFFLINE_CODE_LENGTH or any(c not in ALPHABET for c in code):
+        return None
+    return (
+        decode_base62(code[:BLOCK_PREFIX_LENGTH]),
+        decode_base62(code[BLOCK_PREFIX_LENGTH:]),
+    )
@@ -0,0 +1,182 @@
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_receipts
+from app.core.tasks import TaskQueue
+from app.database import models
+from app.schemas import receipt as receipt_schemas
+from app.services.receipt import ReceiptService
+from app.services.short_codes import parse_offline_short_code
+
+RECEIPT_ID_TAKEN = "Receipt ID is already taken"
+SHORT_CODE_USED = "Short code is already used"
+
+
+class SyncService:
+    """Accepts receipts created by offline tills."""
+
+    def __init__(self, db: AsyncSession, task_queue: TaskQueue | None = None):
+        self.db = db
+        self.task_queue = task_queue
+
+    async def allocate_short_code_block(
+        self, user_id: uuid.UUID, size: int
+    ) -> models.ShortCodeBlock:
+        """Reserves a block of short codes for a till of the user."""
+        block = models.ShortCodeBlock(user_id=user_id, size=size)
+        self.db.add(block)
+        await self.db.commit()
+        return block
+
+    async def sync_receipts(
+        self, user_id: uuid.UUID, batch: receipt_schemas.SyncBatch
+    ) -> receipt_schemas.SyncAck:
+        """Stores new receipts of a batch and acknowledges every stored one.
+
+        Receipts that already exist are acknowledged again, so a till can
+        safely resend a batch whose acknowledgement it never received. A
+        receipt whose short code is already used is rejected on its own,
+        without failing the rest of the batch.
+        """
+        receipts = {r.id: r for r in batch.receipts}
+        acked, rejected = [], []
+
+        result = await self.db.execute(
+            select(models.Receipt.id, models.Receipt.user_id).where(
+                models.Receipt.id.in_(receipts.keys())
+            )
+        )
+        existing = dict(result.tuples().all())
+
+        codes = {
+            r.id: parse_offline_short_code(r.short_code) for r in receipts.values()
+        }
+        block_ids = {code[0] for code in codes.values() if code}
+        result = await self.db.execute(
+            select(models.ShortCodeBlock.id, models.ShortCodeBlock.size).where(
+                models.ShortCodeBlock.id.in_(block_ids),
+                models.ShortCodeBlock.user_id == user_id,
+            )
+        )
+        block_sizes = dict(result.tuples().all())
+
+        short_codes = {r.short_code for r in receipts.values()}
+        # Коди заархівованих чеків лишаються зайнятими
+        result = await self.db.execute(
+            select(models.ShortLink.short_code)
+            .where(models.ShortLink.short_code.in_(short_codes))
+            .union_all(
+                select(models.ArchivedReceipt.short_code).where(
+                    models.ArchivedReceipt.short_code.in_(short_codes)
+                )
+            )
+        )
+        used_codes = set(result.scalars())
+
+        pending = []
+        for receipt_id, receipt in receipts.items():
+            if receipt_id in existing:
+                if existing[receipt_id] == user_id:
+                    acked.append(receipt_id)
+                else:
+                    rejected.append(
+                        receipt_schemas.SyncRejection(
+                            id=receipt_id, reason=RECEIPT_ID_TAKEN
+                        )
+                    )
+                continue
+
+            code = codes[receipt_id]
+            if code is None or code[1] >= block_sizes.get(code[0], 0):
+                rejected.append(
+                    receipt_schemas.SyncRejection(
+                        id=receipt_id,
+                        reason="Short code is not from a block allocated to the user",
+                    )
+                )
+                continue
+
+            if receipt.short_code in used_codes:
+                rejected.append(
+                    receipt_schemas.SyncRejection(id=receipt_id, reason=SHORT_CODE_USED)
+                )
+                continue
+
+            used_codes.add(receipt.short_code)
+            pending.append(receipt)
+
+        try:
+            new_receipts = [self._build_receipt(r, user_id) for r in pending]
+            self.db.add_all(new_receipts)
+            await self.db.commit()
+        except IntegrityError:
+            # Паралельна синхронізація встигла зайняти ID або код - вставляємо по одному
+            await self.db.rollback()
+            new_receipts, conflicts = await self._insert_each(pending, user_id)
+            await self.db.commit()
+            for receipt_id, reason in conflicts:
+                if reason is None:
+                    acked.append(receipt_id)
+                else:
+                    rejected.append(
+                        receipt_schemas.SyncRejection(id=receipt_id, reason=reason)
+                    )
+        if new_receipts:
+            await invalidate_receipts(user_id)
+
+        for db_receipt in new_receipts:
+            acked.append(db_receipt.id)
+            if self.task_queue:
+                await self.task_queue.enqueue(
+                    "receipt_created",
+                    receipt_id=str(db_receipt.id),
+                    user_id=str(user_id),
+                )
+
+        return receipt_schemas.SyncAck(acked=acked, rejected=rejected)
+
+    @staticmethod
+    def _build_receipt(
+        receipt: receipt_schemas.SyncReceipt, user_id: uuid.UUID
+    ) -> models.Receipt:
+        db_receipt = ReceiptService.build_receipt(
+            receipt,
+            user_id,
+            id=receipt.id,
+            created_at=receipt.created_at,
+        )
+        db_receipt.short_link = models.ShortLink(short_code=receipt.short_code)
+        return db_receipt
+
+    async def _insert_each(
+        self, receipts: list[receipt_schemas.SyncReceipt], user_id: uuid.UUID
+    ) -> tuple[list[models.Receipt], list[tuple[uuid.UUID, str | None]]]:
+        """Inserts receipts one savepoint each.
+
+        Returns the inserted receipts and (id, reason) of the conflicting
+        ones; reason is None for a receipt the user has already stored.
+        """
+        inserted, conflicts = [], []
+        for receipt in receipts:
+            db_receipt = self._build_receipt(receipt, user_id)
+            try:
+                async with self.db.begin_nested():
+                    self.db.add(db_receipt)
+            except IntegrityError:
+                owner = await self.db.scalar(
+                    select(models.Receipt.user_id).where(
+                        models.Receipt.id == receipt.id
+                    )
+                )
+                if owner is None:
+                    conflicts.append((receipt.id, SHORT_CODE_USED))
+                elif owner == user_id:
+                    conflicts.append((receipt.id, None))
+                else:
+                    conflicts.append((receipt.id, RECEIPT_ID_TAKEN))
+                continue
+            inserted.append(db_receipt)
+        return inserted, conflicts
@@ -0,0 +1,27 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from app.schemas import receipt as receipt_schemas
+
+CENT = Decimal("0.01")
+
+
+def to_money(value: float | Decimal) -> Decimal:
+    """Converts a number to a Decimal rounded to cents, as stored in Numeric(10, 2)."""
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def calculate_totals(receipt: receipt_schemas.ReceiptCreate) -> tuple[Decimal, Decimal]:
+    """Returns the total and the rest of a receipt.
+
+    Shared by the server and offline tills, so both compute identical sums.
+    Line amounts are exact products of the given price and quantity (e.g. a
+    weight of 0.125 kg), and only the total is rounded to cents; the product
+    rows store price and quantity rounded to Numeric(10, 2).
+    """
+    total = sum(
+        (Decimal(str(p.price)) * Decimal(str(p.quantity)) for p in receipt.products),
+        Decimal(0),
+    ).quantize(CENT, rounding=ROUND_HALF_UP)
+    amount = to_money(receipt.payment.amount)
+    rest = amount - total if amount else Decimal(0)
+    return total, rest
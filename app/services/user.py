@@ -1,36 +1,61 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.bloom import BloomFilter
+from app.core.config import settings
 from app.database import models
 from app.schemas import user as user_schemas
 from app.core.security import get_password_hash, verify_password
 
+# Імена, які цей процес уже бачив зайнятими або зареєстрованими
+taken_usernames = BloomFilter(settings.USERNAME_FILTER_CAPACITY)
+
 
 class UserService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, username_filter: BloomFilter | None = None):
         self.db = db
+        self.username_filter = username_filter or taken_usernames
 
     async def create_user(self, user: user_schemas.UserCreate) -> models.User:
-        """Registers a new user."""
-        existing_user_result = await self.db.execute(
-            select(models.User).where(models.User.username == user.username)
+        """Registers a new user.
+
+        The unique index on username is the check itself, so concurrent
+        signups with one name cannot both succeed. Names the filter has seen
+        are confirmed with a cheap lookup before the password is hashed.
+        """
+        username_taken = HTTPException(
+            status_code=400, detail="Username already registered"
         )
-        existing_user = existing_user_result.scalar_one_or_none()
-        if existing_user:
-            raise HTTPException(status_code=400, detail="Username already registered")
-
-        hashed_password = get_password_hash(user.password)
-        db_user = models.User(
-            username=user.username,
-            full_name=user.full_name,
-            hashed_password=hashed_password,
+        if user.username in self.username_filter and await self._username_exists(
+            user.username
+        ):
+            raise username_taken
+
+        result = await self.db.execute(
+            insert(models.User)
+            .values(
+                username=user.username,
+                full_name=user.full_name,
+                hashed_password=get_password_hash(user.password),
+            )
+            .on_conflict_do_nothing(index_elements=["username"])
+            .returning(models.User)
         )
-        self.db.add(db_user)
+        db_user = result.scalar_one_or_none()
+        self.username_filter.add(user.username)
+        if db_user is None:
+            raise username_taken
+
         await self.db.commit()
-        await self.db.refresh(db_user)
         return db_user
 
+    async def _username_exists(self, username: str) -> bool:
+        return await self.db.scalar(
+            select(exists().where(models.User.username == username))
+        )
+
     async def authenticate_user(
         self, form_data: user_schemas.TokenRequestForm
     ) -> models.User:
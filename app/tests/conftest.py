@@ -5,9 +5,12 @@ import asyncio
 import pytest_asyncio
 from dotenv import load_dotenv
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
+from app.core.config import settings
 from app.main import app
+from app.database import models
 from app.database.db import get_db
 from app.schemas.user import UserCreate
 from app.services.user import UserService
@@ -40,6 +43,22 @@ async def db_session():
         await trans.rollback()
 
 
+@pytest_asyncio.fixture(loop_scope="session")
+async def jobs_session_factory():
+    """Sessions that really commit, for the durable task queue.
+
+    Its workers claim jobs in their own transactions, so the rolled back
+    db_session cannot be used; the jobs table is cleaned up instead.
+    """
+    async with TestSessionLocal() as session:
+        await session.execute(delete(models.BackgroundJob))
+        await session.commit()
+    yield TestSessionLocal
+    async with TestSessionLocal() as session:
+        await session.execute(delete(models.BackgroundJob))
+        await session.commit()
+
+
 @pytest_asyncio.fixture(loop_scope="session")
 async def override_get_db(db_session):
     async def _override_get_db():
@@ -51,7 +70,9 @@ async def override_get_db(db_session):
 
 
 @pytest_asyncio.fixture(loop_scope="session")
-async def client(override_get_db):
+async def client(override_get_db, monkeypatch):
+    # Бакети модульного app спільні для всіх тестів, ліміти - у test_rate_limit
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://0.0.0.0:8000") as ac:
         yield ac
@@ -94,3 +115,54 @@ async def create_test_receipt(client, create_test_user, auth_header):
         headers=auth_header,
     )
     return response.json()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def committing_client(monkeypatch):
+    """Client signed in as a new user, with a committing session per request.
+
+    For concurrent requests, which cannot share db_session; the user and its
+    receipts are deleted afterwards.
+    """
+
+    async def _get_db():
+        async with TestSessionLocal() as session:
+            yield session
+
+    async with TestSessionLocal() as session:
+        user = await UserService(session).create_user(
+            UserCreate(
+                username=f"test_user{uuid.uuid4()}",
+                full_name="Test User",
+                password="test_password",
+            )
+        )
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    app.dependency_overrides[get_db] = _get_db
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://0.0.0.0:8000"
+        ) as ac:
+            response = await ac.post(
+                "/users/signin/",
+                json={"username": user.username, "password": "test_password"},
+            )
+            token = response.json()
+            ac.headers["Authorization"] = (
+                f"{token['token_type']} {token['access_token']}"
+            )
+            yield ac
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        receipt_ids = select(models.Receipt.id).where(models.Receipt.user_id == user.id)
+        async with TestSessionLocal() as session:
+            for table, condition in (
+                (models.IdempotencyKey, models.IdempotencyKey.user_id == user.id),
+                (models.Product, models.Product.receipt_id.in_(receipt_ids)),
+                (models.ShortLink, models.ShortLink.receipt_id.in_(receipt_ids)),
+                (models.Receipt, models.Receipt.user_id == user.id),
+                (models.User, models.User.id == user.id),
+            ):
+                await session.execute(delete(table).where(condition))
+            await session.commit()
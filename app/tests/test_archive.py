@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.database import models
+from app.services.archive import ArchiveService, months_ago
+from app.services.public import render_cache
+
+
+def test_months_ago_clamps_day():
+    now = datetime(2025, 3, 31, 12, 0, tzinfo=timezone.utc)
+    assert months_ago(1, now) == datetime(2025, 2, 28, 12, 0, tzinfo=timezone.utc)
+    assert months_ago(15, now) == datetime(2023, 12, 31, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_archived_receipt_served_by_short_code(
+    client, auth_header, db_session, create_test_receipt, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+    public_url = create_test_receipt["public_url"]
+    before = await client.get(public_url)
+
+    archived = await ArchiveService(db_session).archive_before(
+        datetime.now(timezone.utc)
+    )
+    assert archived >= 1
+    assert list(tmp_path.glob("*.seg"))
+
+    response = await client.get(
+        f"/receipts/{create_test_receipt['id']}/", headers=auth_header
+    )
+    assert response.status_code == 404
+
+    # Текст має прийти з архіву, а не з кешу рендерингу
+    render_cache.clear()
+    after = await client.get(public_url)
+    assert after.status_code == 200
+    assert after.text == before.text
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_archive_skips_receipts_without_short_link(
+    db_session, create_test_receipt, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+    receipt_id = uuid.UUID(create_test_receipt["id"])
+    await db_session.execute(
+        delete(models.ShortLink).where(models.ShortLink.receipt_id == receipt_id)
+    )
+    await db_session.commit()
+
+    await ArchiveService(db_session).archive_before(datetime.now(timezone.utc))
+
+    assert await db_session.scalar(
+        select(models.Receipt.id).where(models.Receipt.id == receipt_id)
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_archived_short_code_is_not_reused(
+    client, auth_header, db_session, create_test_receipt, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+    archived_code = create_test_receipt["public_url"].rstrip("/").rsplit("/", 1)[-1]
+    await ArchiveService(db_session).archive_before(datetime.now(timezone.utc))
+    assert await db_session.get(models.ArchivedReceipt, archived_code)
+
+    codes = iter([archived_code, "Fresh123"])
+    monkeypatch.setattr(
+        models.ShortLink, "generate_short_code", staticmethod(lambda: next(codes))
+    )
+    response = await client.post(
+        "/receipts/",
+        json={
+            "products": [{"name": "Хліб", "price": 20, "quantity": 1}],
+            "payment": {"type": "cash", "amount": 20},
+        },
+        headers=auth_header,
+    )
+    assert response.status_code == 200
+    assert response.json()["public_url"].rstrip("/").endswith("Fresh123")
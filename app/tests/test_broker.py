@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.core import broker as broker_module
+from app.core.broker import PostgresReceiptBroker, ReceiptBroker
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_broker_delivers_only_to_receipt_owner():
+    broker = ReceiptBroker()
+
+    async with broker.subscribe("alice") as alice, broker.subscribe("bob") as bob:
+        await broker.publish("alice", "receipt-1")
+
+        assert await asyncio.wait_for(alice.get(), 1) == "receipt-1"
+        assert bob.empty()
+
+    # Після відписки подія нікуди не доставляється
+    await broker.publish("alice", "receipt-2")
+    assert not broker._subscribers
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_broker_drops_events_for_lagging_subscriber():
+    broker = ReceiptBroker(max_queue_size=1)
+
+    async with broker.subscribe("alice") as slow, broker.subscribe("alice") as fast:
+        await broker.publish("alice", "receipt-1")
+        assert await fast.get() == "receipt-1"
+        await broker.publish("alice", "receipt-2")
+
+        assert slow.qsize() == 1
+        assert await fast.get() == "receipt-2"
+
+
+class FakeConnection:
+    def __init__(self):
+        self.termination_listeners = []
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def add_listener(self, channel, callback):
+        pass
+
+    async def close(self):
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_postgres_broker_reconnects_with_backoff(monkeypatch):
+    asyncpg = pytest.importorskip("asyncpg")
+    first, second = FakeConnection(), FakeConnection()
+    attempts = iter([first, OSError("connection refused"), second])
+
+    async def connect(dsn):
+        result = next(attempts)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    monkeypatch.setattr(broker_module.asyncio, "sleep", sleep)
+    broker = PostgresReceiptBroker("postgresql://test", reconnect_delay=0.5)
+    await broker.start()
+    assert broker._conn is first
+
+    # Обрив з'єднання сервером
+    await first.close()
+    for _ in range(10):
+        await real_sleep(0)
+    assert broker._conn is second
+    assert delays == [0.5, 1.0]
+
+    await broker.stop()
+    assert broker._conn is None
@@ -0,0 +1,75 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import InMemoryResultCache, RedisResultCache, invalidate_receipts
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_result_cache_generation_invalidates_keys():
+    cache = InMemoryResultCache()
+
+    key = await cache.key("receipts:1", skip=0, limit=10)
+    assert key == await cache.key("receipts:1", limit=10, skip=0)
+    await cache.set(key, b"[]")
+    assert await cache.get(key) == b"[]"
+
+    await cache.invalidate("receipts:1")
+    new_key = await cache.key("receipts:1", skip=0, limit=10)
+    assert new_key != key
+    assert await cache.get(new_key) is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_result_cache_evicts_least_recently_used():
+    cache = InMemoryResultCache(max_entries=2)
+
+    await cache.set("a", b"1")
+    await cache.set("b", b"2")
+    await cache.get("a")
+    await cache.set("c", b"3")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"1"
+    assert await cache.get("c") == b"3"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_result_cache_shares_generations():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    first, second = RedisResultCache(client), RedisResultCache(client)
+
+    key = await first.key("receipts:1", skip=0)
+    await first.set(key, b"[]")
+    assert await second.get(key) == b"[]"
+
+    await second.invalidate("receipts:1")
+    assert await first.key("receipts:1", skip=0) != key
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_failed_invalidation_bypasses_cache(monkeypatch):
+    cache = InMemoryResultCache()
+    key = await cache.key("receipts:1", skip=0)
+    await cache.set(key, b"[]")
+
+    async def fail(namespace):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(cache, "invalidate", fail)
+    monkeypatch.setattr(cache_module, "result_cache", cache)
+    await invalidate_receipts(1)
+
+    # Старий список не віддається, а нові не кешуються
+    assert await cache.key("receipts:1", skip=0) is None
+    assert await cache.get(None) is None
+    cache.bypass_until = 0.0
+    assert await cache.get(await cache.key("receipts:1", skip=0)) == b"[]"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_health_reports_result_cache_stats(client):
+    response = await client.get("/health/")
+    assert response.status_code == 200
+    assert set(response.json()["result_cache"]) == {"hits", "misses", "hit_rate"}
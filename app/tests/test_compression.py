@@ -0,0 +1,43 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.core.compression import (
+    COMPRESSORS,
+    CompressionMiddleware,
+    negotiate_encoding,
+)
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, identity") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("*") == next(iter(COMPRESSORS))
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("encoding", list(COMPRESSORS))
+async def test_compression_middleware(encoding):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    async def large():
+        return [{"public_url": "http://localhost:8000/public/code/"}] * 100
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/large", headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert int(response.headers["content-length"]) < 500
+        assert len(response.json()) == 100
+
+        response = await client.get("/small", headers={"Accept-Encoding": encoding})
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
@@ -0,0 +1,24 @@
+import pytest
+from starlette.requests import Request
+
+from app.database import db
+
+
+async def open_session(method: str):
+    request = Request({"type": "http", "method": method, "headers": []})
+    generator = db.get_db(request)
+    session = await anext(generator)
+    await generator.aclose()
+    return session
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_db_uses_autocommit_for_reads():
+    session = await open_session("GET")
+    assert session.bind.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_db_uses_transaction_for_writes():
+    session = await open_session("POST")
+    assert "isolation_level" not in session.bind.get_execution_options()
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.database import models
+from app.services.layout import get_layout, render_receipts
+from app.services.public import format_receipt_text
+
+
+def make_receipt() -> models.Receipt:
+    return models.Receipt(
+        payment_type="cash",
+        payment_amount=Decimal("50.00"),
+        total=Decimal("40.00"),
+        rest=Decimal("10.00"),
+        created_at=datetime(2026, 1, 2, 3, 4, tzinfo=timezone.utc),
+        products_snapshot=[
+            {"name": "Product 1", "price": "10.00", "quantity": "2.00"},
+            {"name": "Long product name", "price": "20.00", "quantity": "1.00"},
+        ],
+    )
+
+
+def test_format_receipt_text_wraps_long_names():
+    assert format_receipt_text(make_receipt(), 16).split("\n") == [
+        "ФОП Checkbox Test Task",
+        "================",
+        "Product 1       ",
+        "2.00 x  10.00 =   20.00",
+        "----------------",
+        "Long product nam",
+        "e               ",
+        "1.00 x  20.00 =   20.00",
+        "================",
+        "СУМА       40.00",
+        "Готівка     50.00",
+        "Решта      10.00",
+        "================",
+        "02.01.2026 03:04",
+        "Дякуємо за покупку!",
+    ]
+
+
+def test_render_receipts_with_locale():
+    texts = render_receipts([make_receipt(), make_receipt()], 32, "en")
+
+    assert texts[0] == texts[1]
+    lines = texts[0].split("\n")
+    assert lines[:2] == [
+        "     ФОП Checkbox Test Task     ",
+        "================================",
+    ]
+    assert lines[-6:] == [
+        "TOTAL                      40.00",
+        "Cash                       50.00",
+        "Change                     10.00",
+        "================================",
+        "        2026-01-02 03:04        ",
+        "  Thank you for your purchase!  ",
+    ]
+    assert get_layout(32, "en") is get_layout(32, "en")
@@ -0,0 +1,142 @@
+import random
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.api.receipts import build_receipt_response
+from app.core.config import settings
+from app.database import models
+from app.schemas import receipt as receipt_schemas
+from app.services.layout import get_layout
+from app.services.money import format_minor, to_minor
+from app.services.receipt import ReceiptService
+from app.services.totals import calculate_totals, to_money
+
+
+def from_minor(minor: int) -> Decimal:
+    # Так Numeric-колонки заповнює тригер receipts_fill_money
+    return Decimal(minor) / 100
+
+
+def random_receipt(rng: random.Random) -> receipt_schemas.ReceiptCreate:
+    products = [
+        receipt_schemas.ProductBase(
+            name=f"Product {i}",
+            price=round(rng.uniform(0.01, 999), rng.choice((0, 1, 2, 3))) or 0.01,
+            quantity=rng.choice((1, 3, round(rng.uniform(0.001, 20), 3))),
+        )
+        for i in range(rng.randint(1, 6))
+    ]
+    return receipt_schemas.ReceiptCreate(
+        products=products,
+        payment=receipt_schemas.Payment(
+            type=rng.choice(("cash", "cashless")),
+            amount=round(rng.uniform(0.01, 5000), 2),
+        ),
+    )
+
+
+def build(receipt: receipt_schemas.ReceiptCreate, mode: str, monkeypatch):
+    monkeypatch.setattr(settings, "MONEY_MODE", mode)
+    db_receipt = ReceiptService.build_receipt(
+        receipt,
+        uuid.uuid4(),
+        id=uuid.uuid4(),
+        created_at=datetime(2026, 1, 2, tzinfo=timezone.utc),
+    )
+    db_receipt.short_link = models.ShortLink(short_code="abcd1234")
+    return db_receipt
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["0.005", "0.004", "1.015", "2.675", "1e-3", "12", "-3.335", "7.9999", "1.5e3"],
+)
+def test_to_minor_matches_to_money(value):
+    assert to_minor(value) == int(to_money(value).scaleb(2))
+
+
+def test_to_minor_matches_to_money_on_floats():
+    rng = random.Random(1)
+    for _ in range(5000):
+        value = round(rng.uniform(0, 10_000), rng.randint(0, 4))
+        assert to_minor(value) == int(to_money(value).scaleb(2))
+
+
+def test_totals_multiply_exact_weights_and_round_once(monkeypatch):
+    receipt = receipt_schemas.ReceiptCreate(
+        products=[
+            receipt_schemas.ProductBase(name="Сир", price=100, quantity=0.125),
+            receipt_schemas.ProductBase(name="Кава", price=19.99, quantity=0.333),
+        ],
+        payment=receipt_schemas.Payment(type="cash", amount=20),
+    )
+    # 12.5 + 6.65667, а не 100 * 0.13 + 19.99 * 0.33
+    assert calculate_totals(receipt) == (Decimal("19.16"), Decimal("0.84"))
+
+    for mode in ("decimal", "minor"):
+        db_receipt = build(receipt, mode, monkeypatch)
+        total = db_receipt.total_minor if mode == "minor" else db_receipt.total
+        assert total in (1916, Decimal("19.16"))
+
+
+def test_format_minor():
+    assert [format_minor(v) for v in (0, 5, 1234, -250)] == [
+        "0.00",
+        "0.05",
+        "12.34",
+        "-2.50",
+    ]
+
+
+def test_minor_mode_matches_decimal_mode(monkeypatch):
+    rng = random.Random(7)
+    for _ in range(300):
+        receipt = random_receipt(rng)
+        decimal_receipt = build(receipt, "decimal", monkeypatch)
+        decimal_json = build_receipt_response(decimal_receipt).model_dump(
+            exclude={"id", "user_id"}
+        )
+        decimal_text = get_layout(32).render(decimal_receipt)
+
+        minor_receipt = build(receipt, "minor", monkeypatch)
+        # Numeric-колонки чека в копійках заповнює тригер БД
+        assert minor_receipt.total is None
+        assert [minor_receipt.total_minor, minor_receipt.rest_minor] == [
+            int(v.scaleb(2)) for v in calculate_totals(receipt)
+        ]
+        assert minor_receipt.product_lines == decimal_receipt.product_lines
+        assert (
+            build_receipt_response(minor_receipt).model_dump(exclude={"id", "user_id"})
+            == decimal_json
+        )
+        assert get_layout(32).render(minor_receipt) == decimal_text
+
+        # Чек, створений у режимі minor, так само читається в режимі decimal
+        monkeypatch.setattr(settings, "MONEY_MODE", "decimal")
+        minor_receipt.payment_amount = from_minor(minor_receipt.payment_amount_minor)
+        minor_receipt.total = from_minor(minor_receipt.total_minor)
+        minor_receipt.rest = from_minor(minor_receipt.rest_minor)
+        assert get_layout(32).render(minor_receipt) == decimal_text
+
+
+def test_minor_mode_reads_rows_without_minor_values(monkeypatch):
+    # Архівні чеки мають лише Numeric-значення
+    receipt = models.Receipt(
+        payment_type="cash",
+        payment_amount=Decimal("50.00"),
+        total=Decimal("40.13"),
+        rest=Decimal("9.87"),
+        created_at=datetime(2026, 1, 2, tzinfo=timezone.utc),
+        products_snapshot=[
+            {"name": "Product 1", "price": "10.05", "quantity": "2.50"},
+            {"name": "Product 2", "price": "15.00", "quantity": "1.00"},
+        ],
+    )
+    expected = get_layout(32).render(receipt)
+
+    monkeypatch.setattr(settings, "MONEY_MODE", "minor")
+
+    assert get_layout(32).render(receipt) == expected
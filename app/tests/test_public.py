@@ -6,3 +6,26 @@ async def test_get_receipt_public(client, create_test_receipt):
     public_url = create_test_receipt["public_url"]
     response = await client.get(public_url)
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_receipts_public_batch(client, create_test_receipt):
+    short_code = create_test_receipt["public_url"].rstrip("/").rsplit("/", 1)[-1]
+    single = await client.get(create_test_receipt["public_url"])
+
+    response = await client.post(
+        "/public/batch/", json={"short_codes": [short_code, "unknown1"]}
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"short_code": short_code, "text": single.text},
+        {"short_code": "unknown1", "text": None},
+    ]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_receipts_public_batch_limits_size(client):
+    response = await client.post(
+        "/public/batch/", json={"short_codes": [f"code{i}" for i in range(101)]}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import FastAPI, Request
+from httpx import AsyncClient, ASGITransport
+
+from app.core.config import settings
+from app.core.rate_limit import (
+    AdmissionControlMiddleware,
+    InMemoryRateLimiter,
+    RedisRateLimiter,
+    charge_rate_limit,
+)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_in_memory_rate_limiter_refills():
+    limiter = InMemoryRateLimiter()
+
+    assert await limiter.acquire("user:1", rate=1, capacity=2, now=0) == 0
+    assert await limiter.acquire("user:1", rate=1, capacity=2, now=0) == 0
+    assert await limiter.acquire("user:1", rate=1, capacity=2, now=0) == 1
+    assert await limiter.acquire("user:2", rate=1, capacity=2, now=0) == 0
+    assert await limiter.acquire("user:1", rate=1, capacity=2, now=1) == 0
+    # Дорожчий запит проходить, доки є хоч один токен, і лишає бакет у боргу
+    assert await limiter.acquire("user:2", rate=1, capacity=2, now=0, cost=2) == 0
+    assert await limiter.acquire("user:2", rate=1, capacity=2, now=1) == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_rate_limiter_refills():
+    fakeredis = pytest.importorskip("fakeredis")
+    limiter = RedisRateLimiter(fakeredis.FakeAsyncRedis())
+
+    assert await limiter.acquire("user:1", rate=2, capacity=1, now=100) == 0
+    assert await limiter.acquire("user:1", rate=2, capacity=1, now=100) == 0.5
+    assert await limiter.acquire("user:1", rate=2, capacity=1, now=100.5) == 0
+    assert await limiter.acquire("user:2", rate=2, capacity=3, now=100, cost=3) == 0
+    assert await limiter.acquire("user:2", rate=2, capacity=3, now=100, cost=2) == 0.5
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_admission_control_limits_public_lookups(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "PUBLIC_RATE_LIMIT_BURST", 2)
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, limiter=InMemoryRateLimiter())
+
+    @app.get("/public/{short_code}/")
+    async def public(short_code: str):
+        return short_code
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        codes = [(await client.get(f"/public/code{i}/")).status_code for i in range(3)]
+
+    assert codes == [200, 200, 429]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_admission_control_charges_public_batch_per_code(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "PUBLIC_BATCH_RATE_LIMIT_PER_MINUTE", 60)
+    monkeypatch.setattr(settings, "PUBLIC_BATCH_RATE_LIMIT_BURST", 5)
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, limiter=InMemoryRateLimiter())
+
+    @app.post("/public/batch/")
+    async def batch(request: Request, short_codes: list[str]):
+        await charge_rate_limit(request, len(short_codes))
+        return short_codes
+
+    @app.get("/public/{short_code}/")
+    async def public(short_code: str):
+        return short_code
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        # Пакет більший за burst проходить і лишає борг у 3 коди
+        large = await client.post("/public/batch/", json=["a"] * 8)
+        small = await client.post("/public/batch/", json=["a"])
+        single = await client.get("/public/code/")
+
+    assert large.status_code == 200
+    assert small.status_code == 429
+    assert small.headers["retry-after"] == "4"
+    assert single.status_code == 200
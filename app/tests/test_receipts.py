@@ -1,5 +1,11 @@
+import asyncio
+import json
+
 import pytest
 
+from app.core.tasks import task_queue
+from app.main import app
+
 
 @pytest.mark.asyncio(loop_scope="session")
 async def test_create_receipt(client, auth_header):
@@ -17,6 +23,52 @@ async def test_create_receipt(client, auth_header):
     assert response.status_code == 200
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_create_receipt_idempotency_key(client, auth_header):
+    receipt = {
+        "products": [{"name": "Product 1", "price": 10.0, "quantity": 2}],
+        "payment": {"type": "cashless", "amount": 20.0},
+    }
+    headers = {**auth_header, "Idempotency-Key": "till-1-request-1"}
+
+    first = await client.post("/receipts/", json=receipt, headers=headers)
+    retry = await client.post("/receipts/", json=receipt, headers=headers)
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+
+    response = await client.get("/receipts/", headers=auth_header)
+    assert len(response.json()) == 1
+
+    receipt["payment"]["amount"] = 50.0
+    response = await client.post("/receipts/", json=receipt, headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_requests_with_same_idempotency_key(committing_client):
+    receipt = {
+        "products": [{"name": "Product 1", "price": 10.0, "quantity": 2}],
+        "payment": {"type": "cash", "amount": 20.0},
+    }
+    headers = {"Idempotency-Key": "till-1-request-2"}
+
+    # Другий запит чекає на коміт першого й повертає той самий чек
+    first, second = await asyncio.gather(
+        committing_client.post("/receipts/", json=receipt, headers=headers),
+        committing_client.post("/receipts/", json=receipt, headers=headers),
+    )
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+
+    response = await committing_client.get("/receipts/")
+    assert [r["id"] for r in response.json()] == [first.json()["id"]]
+
+    receipt["products"][0]["quantity"] = 3
+    response = await committing_client.post("/receipts/", json=receipt, headers=headers)
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_list_receipts(client, auth_header, create_test_receipt):
     response = await client.get("/receipts/", headers=auth_header)
@@ -24,6 +76,45 @@ async def test_list_receipts(client, auth_header, create_test_receipt):
     assert len(response.json()) == 1
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_list_receipts_cache_invalidated_on_create(
+    client, auth_header, create_test_receipt
+):
+    first = await client.get("/receipts/", headers=auth_header)
+    second = await client.get("/receipts/", headers=auth_header)
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+
+    created = await client.post(
+        "/receipts/",
+        json={
+            "products": [{"name": "Product 3", "price": 5.0, "quantity": 1}],
+            "payment": {"type": "cashless", "amount": 5.0},
+        },
+        headers=auth_header,
+    )
+    assert created.status_code == 200
+
+    response = await client.get("/receipts/", headers=auth_header)
+    assert response.headers["x-cache"] == "MISS"
+    assert "Accept" in response.headers["vary"].split(", ")
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_list_receipts_msgpack(client, auth_header, create_test_receipt):
+    msgpack = pytest.importorskip("msgpack")
+    response = await client.get(
+        "/receipts/", headers={**auth_header, "Accept": "application/msgpack"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert "Accept" in response.headers["vary"].split(", ")
+    receipts = msgpack.unpackb(response.content, timestamp=3)
+    assert [r["id"] for r in receipts] == [create_test_receipt["id"]]
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_get_receipt(client, auth_header, create_test_receipt):
     receipt_id = create_test_receipt["id"]
@@ -31,3 +122,94 @@ async def test_get_receipt(client, auth_header, create_test_receipt):
     response = await client.get(f"/receipts/{receipt_id}/", headers=auth_header)
     assert response.status_code == 200
     assert response.json()["id"] == receipt_id
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_receipt_products(client, auth_header, create_test_receipt):
+    receipt_id = create_test_receipt["id"]
+
+    response = await client.get(f"/receipts/{receipt_id}/", headers=auth_header)
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()["products"]] == [
+        "Product 1",
+        "Product 2",
+    ]
+    assert response.json()["products"][0]["total"] == 20.0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_search_receipts(client, auth_header, create_test_receipt):
+    response = await client.get(
+        "/receipts/search/",
+        params={"q": "duct 2", "payment_type": "cash"},
+        headers=auth_header,
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.json()[0]["receipt"]["id"] == create_test_receipt["id"]
+    assert response.json()[0]["highlights"] == ["Pro<mark>duct 2</mark>"]
+
+    response = await client.get(
+        "/receipts/search/",
+        params={"q": "duct 2", "payment_type": "cashless"},
+        headers=auth_header,
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_receipts_feed_streams_created_receipt(client, auth_header):
+    # httpx буферизує відповідь ASGI-застосунку повністю, тож потік читаємо напряму
+    chunks: asyncio.Queue[str] = asyncio.Queue()
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            await chunks.put(message["body"].decode())
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/receipts/feed/",
+        "raw_path": b"/receipts/feed/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"authorization", auth_header["Authorization"].encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    task_queue.start()
+    feed = asyncio.create_task(app(scope, receive, send))
+    try:
+        assert await asyncio.wait_for(chunks.get(), 5) == ": connected\n\n"
+
+        created = await client.post(
+            "/receipts/",
+            json={
+                "products": [{"name": "Product 1", "price": 10.0, "quantity": 1}],
+                "payment": {"type": "cash", "amount": 10.0},
+            },
+            headers=auth_header,
+        )
+        assert created.status_code == 200
+
+        event = await asyncio.wait_for(chunks.get(), 5)
+        assert event.startswith(f"id: {created.json()['id']}\nevent: receipt\n")
+        data = json.loads(event.split("data: ", 1)[1])
+        assert data["total"] == created.json()["total"]
+        assert data["products"] == created.json()["products"]
+    finally:
+        disconnected.set()
+        await asyncio.wait_for(feed, 5)
+        await task_queue.drain(5)
@@ -0,0 +1,36 @@
+from datetime import date
+from decimal import Decimal
+
+from app.cli.seed import SeedConfig, SyntheticData
+
+
+def generate(seed: int) -> list:
+    data = SyntheticData(
+        SeedConfig(users=20, receipts_per_user=5, seed=seed, end_date=date(2026, 1, 1))
+    )
+    return [
+        (user, list(data.receipts(user[0]))) for user in data.users("password-hash")
+    ]
+
+
+def test_synthetic_data_is_deterministic():
+    assert generate(1) == generate(1)
+    assert generate(1) != generate(2)
+
+
+def test_synthetic_receipts_are_consistent():
+    short_codes = set()
+    for _, receipts in generate(1):
+        for receipt, products, (receipt_id, short_code) in receipts:
+            _, _, payment_type, amount, total, rest, created_at, _, *minor = receipt
+            assert receipt_id == receipt[0]
+            assert all(p[0] == receipt_id for p in products)
+            assert total == sum(p[2] * p[3] for p in products).quantize(Decimal("0.01"))
+            assert rest == amount - total >= 0
+            assert minor == [int(v * 100) for v in (amount, total, rest)]
+            assert all(p[4:] == (p[2] * 100, p[3] * 100) for p in products)
+            assert created_at.date() < date(2026, 1, 1)
+            short_codes.add(short_code)
+            assert len(short_code) == 9
+
+    assert len(short_codes) == sum(len(r) for _, r in generate(1))
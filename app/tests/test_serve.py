@@ -0,0 +1,80 @@
+import pytest
+
+from app.cli import serve
+from app.cli.serve import multi_worker_overrides, worker_pool_size
+from app.core.config import settings
+from app.database import db
+
+OVERRIDDEN = (
+    "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW",
+    "DB_ECHO",
+    "RESULT_CACHE_BACKEND",
+    "BROKER_BACKEND",
+    "RATE_LIMIT_PER_MINUTE",
+    "RATE_LIMIT_BURST",
+    "PUBLIC_RATE_LIMIT_PER_MINUTE",
+    "PUBLIC_RATE_LIMIT_BURST",
+    "PUBLIC_BATCH_RATE_LIMIT_PER_MINUTE",
+    "PUBLIC_BATCH_RATE_LIMIT_BURST",
+)
+
+
+def test_worker_pool_size_splits_connections():
+    assert worker_pool_size(90, 4) == 22
+    assert worker_pool_size(2, 4) == 1
+    assert worker_pool_size(90, 4, reserved=1) == 21
+
+
+def test_multi_worker_overrides_replace_in_process_state(monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "BROKER_BACKEND", "memory")
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "redis")
+
+    assert multi_worker_overrides(1) == {}
+    assert multi_worker_overrides(4) == {
+        "RESULT_CACHE_BACKEND": "none",
+        "BROKER_BACKEND": "postgres",
+    }
+
+    monkeypatch.setattr(settings, "BROKER_BACKEND", "postgres")
+    assert "BROKER_BACKEND" not in multi_worker_overrides(4)
+
+
+def test_multi_worker_overrides_split_in_memory_rate_limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 120)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BURST", 60)
+    monkeypatch.setattr(settings, "PUBLIC_RATE_LIMIT_PER_MINUTE", 30)
+    monkeypatch.setattr(settings, "PUBLIC_RATE_LIMIT_BURST", 10)
+
+    overrides = multi_worker_overrides(4)
+
+    assert overrides["RATE_LIMIT_PER_MINUTE"] == "30.0"
+    assert overrides["RATE_LIMIT_BURST"] == "15"
+    assert overrides["PUBLIC_RATE_LIMIT_PER_MINUTE"] == "7.5"
+    assert overrides["PUBLIC_RATE_LIMIT_BURST"] == "2"
+
+
+# Із кількома воркерами брокер переходить на postgres і займає одне з'єднання
+@pytest.mark.parametrize("workers, pool_size", [(1, 40), (4, 9)])
+def test_serve_configures_engine_of_this_process(monkeypatch, workers, pool_size):
+    # Налаштування та оточення відновлюються після тесту
+    for name in OVERRIDDEN:
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.setattr(settings, name, getattr(settings, name))
+    monkeypatch.setattr(settings, "DB_ECHO", True)
+    monkeypatch.setattr(settings, "BROKER_BACKEND", "memory")
+    for name in ("engine", "AsyncSessionLocal", "ReadSessionLocal"):
+        monkeypatch.setattr(db, name, None)
+    started = {}
+    monkeypatch.setattr(serve.uvicorn, "run", lambda app, **kw: started.update(kw))
+
+    serve.main(["--workers", str(workers), "--db-max-connections", "40"])
+
+    assert started["workers"] == workers
+    engine = db.init_engine()
+    assert engine.pool.size() == pool_size
+    assert engine.pool._max_overflow == 0
+    assert engine.echo is False
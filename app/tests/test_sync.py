@@ -0,0 +1,132 @@
+import gzip
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.client.offline_till import OfflineTill
+from app.schemas.receipt import Payment, ProductBase, ReceiptCreate
+from app.api.sync import MAX_SYNC_BODY_SIZE
+from app.services.short_codes import offline_short_code, parse_offline_short_code
+
+
+def test_offline_short_code_roundtrip():
+    code = offline_short_code(123456, 999)
+    assert len(code) == 10
+    assert parse_offline_short_code(code) == (123456, 999)
+    assert parse_offline_short_code("abcdEFGH") is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_sync_receipts_is_idempotent(client, auth_header):
+    response = await client.post(
+        "/sync/short-code-blocks/", params={"size": 10}, headers=auth_header
+    )
+    assert response.status_code == 200
+    block = response.json()
+
+    receipt_id = str(uuid.uuid4())
+    batch = {
+        "receipts": [
+            {
+                "id": receipt_id,
+                "short_code": offline_short_code(block["block_id"], 0),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "products": [{"name": "Product 1", "price": 10.0, "quantity": 2}],
+                "payment": {"type": "cash", "amount": 25.0},
+            },
+            {
+                "id": str(uuid.uuid4()),
+                "short_code": offline_short_code(block["block_id"], 10),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "products": [{"name": "Product 2", "price": 5.0, "quantity": 1}],
+                "payment": {"type": "cash", "amount": 5.0},
+            },
+        ]
+    }
+    headers = {**auth_header, "Content-Encoding": "gzip"}
+    body = gzip.compress(json.dumps(batch).encode())
+
+    for _ in range(2):
+        response = await client.post("/sync/receipts/", content=body, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["acked"] == [receipt_id]
+        assert len(response.json()["rejected"]) == 1
+
+    response = await client.get(f"/receipts/{receipt_id}/", headers=auth_header)
+    assert response.json()["rest"] == 5.0
+
+
+def sync_receipt(short_code: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "short_code": short_code,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "products": [{"name": "Product 1", "price": 3.0, "quantity": 1}],
+        "payment": {"type": "cashless", "amount": 3.0},
+    }
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_sync_rejects_used_short_code_per_receipt(client, auth_header):
+    response = await client.post(
+        "/sync/short-code-blocks/", params={"size": 3}, headers=auth_header
+    )
+    block_id = response.json()["block_id"]
+    first, duplicate, other = (
+        sync_receipt(offline_short_code(block_id, i)) for i in (0, 0, 1)
+    )
+
+    response = await client.post(
+        "/sync/receipts/", json={"receipts": [first, duplicate]}, headers=auth_header
+    )
+    assert response.status_code == 200
+    assert response.json()["acked"] == [first["id"]]
+    assert [r["id"] for r in response.json()["rejected"]] == [duplicate["id"]]
+
+    # Повторна відправка з новим чеком не блокується зайнятим кодом
+    response = await client.post(
+        "/sync/receipts/",
+        json={"receipts": [first, duplicate, other]},
+        headers=auth_header,
+    )
+    assert response.status_code == 200
+    assert response.json()["acked"] == [first["id"], other["id"]]
+    assert response.json()["rejected"] == [
+        {"id": duplicate["id"], "reason": "Short code is already used"}
+    ]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_sync_checks_auth_and_size_before_reading_body(client, auth_header):
+    response = await client.post("/sync/receipts/", content=b"{}")
+    assert response.status_code == 403
+
+    response = await client.post(
+        "/sync/receipts/",
+        content=b" " * (MAX_SYNC_BODY_SIZE + 1),
+        headers=auth_header,
+    )
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_offline_till_syncs_pending_receipts(client, auth_header, tmp_path):
+    client.headers.update(auth_header)
+    till = OfflineTill(str(tmp_path / "till.db"), client)
+    await till.reserve_short_codes(min_free=3, size=5)
+
+    receipt = ReceiptCreate(
+        products=[ProductBase(name="Product 1", price=10.0, quantity=1.5)],
+        payment=Payment(type="cashless", amount=15.0),
+    )
+    created = [till.create_receipt(receipt) for _ in range(3)]
+    assert till.pending_count() == 3
+
+    assert await till.sync(batch_size=2) == (3, 0)
+    assert till.pending_count() == 0
+
+    response = await client.get(f"/public/{created[0]['short_code']}/")
+    assert response.status_code == 200
+    till.close()
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.tasks import DurableTaskQueue, TaskQueue
+from app.database import models
+
+
+async def noop(n: int) -> None:
+    pass
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_task_queue_retries_and_drains():
+    queue = TaskQueue(concurrency=2, retry_delay=0.01)
+    calls = []
+
+    @queue.register("flaky")
+    async def flaky(n: int):
+        calls.append(n)
+        if calls.count(n) < 2:
+            raise RuntimeError("temporary failure")
+        await asyncio.sleep(0.01)
+
+    queue.start()
+    for n in range(3):
+        await queue.enqueue("flaky", n=n)
+    await queue.drain(timeout=5)
+
+    assert sorted(calls) == [0, 0, 1, 1, 2, 2]
+    assert not queue.running
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_task_queue_rejects_unknown_job():
+    queue = TaskQueue()
+    with pytest.raises(ValueError):
+        await queue.enqueue("unknown")
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_durable_queue_workers_claim_each_job_once(jobs_session_factory):
+    first = DurableTaskQueue(jobs_session_factory)
+    second = DurableTaskQueue(jobs_session_factory)
+    for queue in (first, second):
+        queue.register("noop")(noop)
+    for n in range(10):
+        await first.enqueue("noop", n=n)
+
+    # Заблокований іншою транзакцією запис пропускається, а не очікується
+    async with jobs_session_factory() as session:
+        locked_id = await session.scalar(
+            select(models.BackgroundJob.id)
+            .order_by(models.BackgroundJob.id)
+            .limit(1)
+            .with_for_update()
+        )
+        job = await second._claim()
+        assert job.id != locked_id
+        await session.rollback()
+
+    claims = await asyncio.gather(
+        *(queue._claim() for _ in range(10) for queue in (first, second))
+    )
+    ids = [job.id for job in claims if job is not None]
+    assert len(ids) == len(set(ids)) == 9
+    assert locked_id in ids
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_durable_queue_fails_job_after_max_retries(jobs_session_factory):
+    queue = DurableTaskQueue(jobs_session_factory, max_retries=2, retry_delay=0)
+    attempts = []
+
+    @queue.register("broken")
+    async def broken():
+        attempts.append(1)
+        raise RuntimeError("permanent failure")
+
+    await queue.enqueue("broken")
+    while (job := await queue._claim()) is not None:
+        await queue._run_durable(job)
+
+    assert len(attempts) == 3
+    async with jobs_session_factory() as session:
+        job = await session.scalar(select(models.BackgroundJob))
+    assert job.status == "failed"
+    assert job.attempts == 3
+    assert "permanent failure" in job.last_error
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_durable_queue_reclaims_jobs_of_dead_worker(jobs_session_factory):
+    queue = DurableTaskQueue(jobs_session_factory, lock_timeout=60)
+    queue.register("noop")(noop)
+    now = datetime.now(timezone.utc)
+    async with jobs_session_factory() as session:
+        stale = models.BackgroundJob(
+            name="noop",
+            payload={"n": 1},
+            status="running",
+            attempts=1,
+            locked_at=now - timedelta(hours=1),
+        )
+        alive = models.BackgroundJob(
+            name="noop", payload={"n": 2}, status="running", attempts=1, locked_at=now
+        )
+        session.add_all([stale, alive])
+        await session.commit()
+
+    job = await queue._claim()
+    assert (job.id, job.attempts) == (stale.id, 2)
+    # Задача живого воркера ще не прострочена
+    assert await queue._claim() is None
+
+    await queue._run_durable(job)
+    async with jobs_session_factory() as session:
+        ids = await session.scalars(select(models.BackgroundJob.id))
+        assert list(ids) == [alive.id]
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import DBAPIError
+from starlette.requests import Request
+
+from app.core.timeouts import query_canceled_handler, run_query
+
+
+def make_request(disconnect_after: float | None = None) -> Request:
+    async def receive():
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    return Request({"type": "http", "method": "GET", "headers": []}, receive)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_run_query_returns_result():
+    async def query():
+        return 42
+
+    assert await run_query(make_request(), query(), timeout=1) == 42
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_run_query_cancels_slow_query():
+    cancelled = asyncio.Event()
+
+    async def query():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(HTTPException) as exc_info:
+        await run_query(make_request(), query(), timeout=0.05)
+    assert exc_info.value.status_code == 504
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_run_query_cancels_on_client_disconnect():
+    with pytest.raises(HTTPException) as exc_info:
+        await run_query(make_request(0.01), asyncio.sleep(10), timeout=5)
+    assert exc_info.value.status_code == 499
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_statement_timeout_maps_to_504():
+    class QueryCanceled(Exception):
+        sqlstate = "57014"
+
+    error = DBAPIError("SELECT 1", None, QueryCanceled())
+    response = await query_canceled_handler(make_request(), error)
+    assert response.status_code == 504
@@ -19,6 +19,20 @@ async def test_create_user(client):
     }
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_create_user_rejects_taken_username(client, create_test_user):
+    user_data = {
+        "full_name": "Other User",
+        "username": create_test_user.username,
+        "password": "other_password",
+    }
+    # Другий запит іде через фільтр імен і не хешує пароль
+    for _ in range(2):
+        response = await client.post("/users/signup/", json=user_data)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Username already registered"
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_login_for_access_token(client, create_test_user):
     response = await client.post(
@@ -0,0 +1,73 @@
+"""Measures the cold-start import cost of the application.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+reports the total import time and the slowest modules. With ``--max-ms`` it
+exits with a non-zero status when the median exceeds the budget, so it can
+track cold-start regressions in CI.
+
+    python benchmarks/import_time.py --runs 5 --top 15 --max-ms 800
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(module: str) -> dict[str, tuple[int, int, int]]:
+    """Returns {module: (self_us, cumulative_us, depth)} for a fresh import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals_ms = [run[args.module][1] / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs")
+    print(f"  min {min(totals_ms):.1f} ms, max {max(totals_ms):.1f} ms")
+
+    # Найповільніші модулі верхнього рівня за медіаною кумулятивного часу
+    last = runs[-1]
+    top_level = [name for name, (_, _, depth) in last.items() if depth == 1]
+    cumulative = {
+        name: statistics.median(run[name][1] for run in runs if name in run)
+        for name in top_level
+    }
+    print(f"\nslowest direct imports of {args.module}:")
+    for name, us in sorted(cumulative.items(), key=lambda i: -i[1])[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"\nFAIL: {median_ms:.1f} ms exceeds budget of {args.max_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
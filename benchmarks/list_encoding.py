@@ -0,0 +1,99 @@
+"""Compares payload size and encoding time of a receipts page.
+
+Builds a page of synthetic receipts with the same schema as GET /receipts/
+and measures JSON (as FastAPI serializes it) against MessagePack, each raw
+and compressed with every available encoding.
+
+    python -m benchmarks.list_encoding --page-size 100 --repeat 200
+"""
+
+import argparse
+import json
+import random
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.compression import COMPRESSORS
+from app.core.responses import msgpack
+from app.schemas import receipt as receipt_schemas
+
+
+def build_page(page_size: int, seed: int = 0) -> list[receipt_schemas.Receipt]:
+    rng = random.Random(seed)
+    user_id = uuid.UUID(int=rng.getrandbits(128))
+    now = datetime.now(timezone.utc)
+    page = []
+    for _ in range(page_size):
+        products = [
+            receipt_schemas.Product(
+                name=f"Product {rng.randint(1, 5000)}",
+                price=round(rng.uniform(5, 500), 2),
+                quantity=rng.choice([1, 1, 1, 2, 3, 0.5, 1.25]),
+                total=0,
+            )
+            for _ in range(rng.randint(1, 8))
+        ]
+        for p in products:
+            p.total = round(p.price * p.quantity, 2)
+        total = round(sum(p.total for p in products), 2)
+        page.append(
+            receipt_schemas.Receipt(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                products=products,
+                payment=receipt_schemas.Payment(type="cash", amount=total + 10),
+                total=total,
+                rest=10,
+                user_id=user_id,
+                public_url=f"http://localhost:8000/public/{uuid.uuid4().hex[:8]}/",
+                created_at=now - timedelta(minutes=rng.randint(0, 10**5)),
+            )
+        )
+    return page
+
+
+def encode_json(page) -> bytes:
+    data = [r.model_dump(mode="json") for r in page]
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_msgpack(page) -> bytes:
+    return msgpack.packb([r.model_dump() for r in page], default=str, datetime=True)
+
+
+def compress(name: str, data: bytes) -> bytes:
+    compressor = COMPRESSORS[name]()
+    return compressor.compress(data) + compressor.finish()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    page = build_page(args.page_size)
+    encoders = {"json": encode_json}
+    if msgpack is not None:
+        encoders["msgpack"] = encode_msgpack
+
+    print(f"page of {args.page_size} receipts, {args.repeat} runs per cell")
+    print(f"{'format':<16} {'bytes':>9} {'encode ms':>10}")
+    for name, encode in encoders.items():
+        data = encode(page)
+        seconds = timeit.timeit(lambda: encode(page), number=args.repeat)
+        print(f"{name:<16} {len(data):>9} {seconds / args.repeat * 1000:>10.3f}")
+        for encoding in COMPRESSORS:
+            compressed = compress(encoding, data)
+            seconds = timeit.timeit(
+                lambda: compress(encoding, encode(page)), number=args.repeat
+            )
+            label = f"{name}+{encoding}"
+            print(
+                f"{label:<16} {len(compressed):>9} "
+                f"{seconds / args.repeat * 1000:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
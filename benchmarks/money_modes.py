@@ -0,0 +1,171 @@
+"""Compares CPU time per receipt of the decimal and minor money modes.
+
+For each mode times the money arithmetic alone (parsing amounts and
+computing totals), then building receipts from synthetic requests (what
+POST /receipts/ does before the INSERT, mostly ORM object construction)
+and serializing them as the API response and as receipt text. Both modes
+must produce identical totals and output; the script also shows how far a
+float sum of the totals drifts from the exact one.
+
+    python -m benchmarks.money_modes --receipts 20000 --repeat 5
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.api.receipts import build_receipt_response
+from app.core.config import settings
+from app.database import models
+from app.schemas import receipt as receipt_schemas
+from app.services.layout import get_layout
+from app.services.money import MinorLine, calculate_totals_minor, format_minor, to_minor
+from app.services.receipt import ReceiptService
+from app.services.totals import calculate_totals, to_money
+
+CREATED_AT = datetime(2026, 1, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def random_requests(count: int, seed: int) -> list[receipt_schemas.ReceiptCreate]:
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        products = [
+            receipt_schemas.ProductBase(
+                name=f"Product {rng.randint(1, 5000)}",
+                price=round(rng.uniform(0.01, 500), 2),
+                quantity=rng.choice((1, 1, 2, 3, round(rng.uniform(0.1, 5), 3))),
+            )
+            for _ in range(rng.randint(1, 8))
+        ]
+        requests.append(
+            receipt_schemas.ReceiptCreate(
+                products=products,
+                payment=receipt_schemas.Payment(
+                    type=rng.choice(("cash", "cashless")),
+                    amount=round(rng.uniform(1, 5000), 2),
+                ),
+            )
+        )
+    return requests
+
+
+def arithmetic_decimal(requests) -> None:
+    for request in requests:
+        [(to_money(p.price), to_money(p.quantity)) for p in request.products]
+        to_money(request.payment.amount)
+        calculate_totals(request)
+
+
+def arithmetic_minor(requests) -> None:
+    for request in requests:
+        lines = [
+            MinorLine(p.name, to_minor(p.price), to_minor(p.quantity))
+            for p in request.products
+        ]
+        calculate_totals_minor(request.products, to_minor(request.payment.amount))
+
+
+ARITHMETIC = {"decimal": arithmetic_decimal, "minor": arithmetic_minor}
+
+
+def receipt_totals(receipt: models.Receipt) -> tuple[int, int]:
+    if receipt.total_minor is not None:
+        return receipt.total_minor, receipt.rest_minor
+    return int(receipt.total.scaleb(2)), int(receipt.rest.scaleb(2))
+
+
+def run_mode(mode: str, requests, user_id: uuid.UUID) -> dict:
+    settings.MONEY_MODE = mode
+    layout = get_layout(settings.LINE_LENGTH)
+    short_link = models.ShortLink(short_code="abcd1234")
+
+    # Як і timeit, без збирача сміття: інакше час залежить від того, скільки
+    # ORM-об'єктів лишилось від попереднього прогону
+    gc.collect()
+    gc.disable()
+    started = time.process_time()
+    ARITHMETIC[mode](requests)
+    computed = time.process_time()
+    receipts = [
+        ReceiptService.build_receipt(
+            request, user_id, id=uuid.UUID(int=i), created_at=CREATED_AT
+        )
+        for i, request in enumerate(requests)
+    ]
+    built = time.process_time()
+    for receipt in receipts:
+        receipt.short_link = short_link
+    responses = [build_receipt_response(r).model_dump_json() for r in receipts]
+    serialized = time.process_time()
+    texts = [layout.render(r) for r in receipts]
+    rendered = time.process_time()
+    gc.enable()
+
+    return {
+        "arithmetic": computed - started,
+        "build": built - computed,
+        "response": serialized - built,
+        "text": rendered - serialized,
+        "totals": [receipt_totals(r) for r in receipts],
+        "responses": responses,
+        "texts": texts,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--receipts", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    requests = random_requests(args.receipts, args.seed)
+    user_id = uuid.UUID(int=args.seed)
+    steps = ("arithmetic", "build", "response", "text")
+    results = {}
+    # Режими чергуються, щоб фонове навантаження впливало на обидва однаково
+    for _ in range(args.repeat):
+        for mode in ("decimal", "minor"):
+            result = run_mode(mode, requests, user_id)
+            best = results.setdefault(mode, result)
+            for step in steps:
+                best[step] = min(best[step], result[step])
+
+    print(
+        f"{args.receipts} receipts, CPU time per receipt, us"
+        f" (best of {args.repeat})"
+    )
+    print(f"{'mode':<8}" + "".join(f"{step:>11}" for step in steps) + f"{'total':>8}")
+    for mode, result in results.items():
+        times = [result[step] * 1e6 / args.receipts for step in steps]
+        print(
+            f"{mode:<8}"
+            + "".join(f"{t:>11.1f}" for t in times)
+            + f"{sum(times) - times[0]:>8.1f}"
+        )
+    print("(total = build + response + text; build includes the arithmetic)")
+
+    decimal, minor = results["decimal"], results["minor"]
+    mismatches = sum(
+        decimal[key] != minor[key] for key in ("totals", "responses", "texts")
+    )
+
+    # Ті самі суми, складені як float, накопичують похибку
+    exact = sum(total for total, _ in minor["totals"])
+    floats = sum(total / 100 for total, _ in minor["totals"])
+    print(
+        f"sum of totals: exact {format_minor(exact)},"
+        f" float {floats!r} (off by {abs(floats - exact / 100):.2e})"
+    )
+
+    print("identical output in both modes" if not mismatches else "OUTPUT DIFFERS")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
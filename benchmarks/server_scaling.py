@@ -0,0 +1,128 @@
+"""Measures how throughput scales with the number of server workers.
+
+Starts ``python -m app.cli.serve`` with 1, 2, 4 ... N workers and drives it
+with several client processes for a fixed duration, then prints requests per
+second and latency percentiles for each worker count.
+
+    python benchmarks/server_scaling.py --max-workers 8 --path / --duration 10
+
+Use a DB-backed path (e.g. ``/public/<short_code>/``) against a migrated
+database to include query cost; the default ``/`` measures the HTTP stack only.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def _drive(url: str, concurrency: int, duration: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(url)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def drive(url: str, concurrency: int, duration: float) -> list[float]:
+    return asyncio.run(_drive(url, concurrency, duration))
+
+
+def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start in {timeout} s")
+
+
+def run(workers: int, args) -> tuple[float, float, float]:
+    env = {**os.environ, "RATE_LIMIT_ENABLED": "false", "DB_ECHO": "false"}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "app.cli.serve",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(args.port),
+            "--workers",
+            str(workers),
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{args.port}{args.path}"
+        wait_until_ready(url)
+        with ProcessPoolExecutor(args.clients) as pool:
+            results = pool.map(
+                drive,
+                [url] * args.clients,
+                [args.concurrency] * args.clients,
+                [args.duration] * args.clients,
+            )
+            latencies = sorted(l for result in results for l in result)
+    finally:
+        server.terminate()
+        server.wait()
+
+    rps = len(latencies) / args.duration
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    return rps, p50, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    counts = [1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}")
+    baseline = None
+    for workers in counts:
+        rps, p50, p99 = run(workers, args)
+        baseline = baseline or rps
+        print(
+            f"{workers:>7} {rps:>10.0f} {p50:>8.2f} {p99:>8.2f} {rps / baseline:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Runs concurrent signups against a migrated database.
+
+Fires many simultaneous signups for one username (exactly one must win),
+then repeats signups of an already taken name to show the cost with the
+username filter (lookup only) and without it (bcrypt + insert).
+
+    python -m benchmarks.signup_concurrency --concurrency 50 --repeat 20
+
+Created users are deleted at the end.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+from app.core.bloom import BloomFilter
+from app.database import db, models
+from app.schemas.user import UserCreate
+from app.services.user import UserService
+
+
+async def signup(user: UserCreate, username_filter: BloomFilter) -> tuple[bool, float]:
+    start = time.perf_counter()
+    async with db.get_session_factory()() as session:
+        try:
+            await UserService(session, username_filter).create_user(user)
+            created = True
+        except HTTPException:
+            created = False
+    return created, time.perf_counter() - start
+
+
+def report(label: str, latencies: list[float]) -> None:
+    print(
+        f"{label:<32} median {statistics.median(latencies) * 1000:7.1f} ms"
+        f"  max {max(latencies) * 1000:7.1f} ms"
+    )
+
+
+async def run(concurrency: int, repeat: int) -> None:
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    user = UserCreate(username=username, full_name="Bench", password="bench_password")
+    try:
+        results = await asyncio.gather(
+            *(signup(user, BloomFilter()) for _ in range(concurrency))
+        )
+        winners = sum(created for created, _ in results)
+        print(f"{concurrency} concurrent signups of one name: {winners} succeeded")
+        assert winners == 1, "username uniqueness violated"
+        report("concurrent signup", [latency for _, latency in results])
+
+        warm = BloomFilter()
+        warm.add(username)
+        for label, make_filter in (
+            ("repeat signup, filter hit", lambda: warm),
+            ("repeat signup, filter miss", BloomFilter),
+        ):
+            latencies = []
+            for _ in range(repeat):
+                created, latency = await signup(user, make_filter())
+                assert not created
+                latencies.append(latency)
+            report(label, latencies)
+    finally:
+        async with db.get_session_factory()() as session:
+            await session.execute(
+                delete(models.User).where(models.User.username == username)
+            )
+            await session.commit()
+        await db.dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db.init_engine(echo=False, pool_size=args.concurrency, max_overflow=0)
+    asyncio.run(run(args.concurrency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
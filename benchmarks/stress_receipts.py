@@ -0,0 +1,344 @@
+"""Stress test of signup and receipt creation under many concurrent clients.
+
+Drives the ASGI app in-process against the database from the settings
+(migrate it first), then checks invariants on what was written:
+
+* concurrent signups of one username: exactly one succeeds;
+* every acknowledged receipt is stored (no lost receipts);
+* stored totals and rest match the ones computed from the request;
+* every receipt has exactly one short link and no short code repeats;
+* replays with the same Idempotency-Key return the same receipt.
+
+While running it samples throughput, latency, pool usage and lock waits
+(pg_locks / pg_stat_activity) once per interval. Rows created by the run
+are deleted at the end. Signups hash passwords with bcrypt, so setting up
+many clients takes a while.
+
+    python -m benchmarks.stress_receipts --clients 200 --receipts 20
+
+--code-space N draws short codes from only N values, so the ShortLink
+collision retry loop is exercised; keep N well above the number of
+receipts created.
+"""
+
+import argparse
+import asyncio
+import random
+import secrets
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.tasks import task_queue
+from app.database import db, models
+from app.main import app
+from app.schemas import receipt as receipt_schemas
+from app.services.short_codes import encode_base62
+from app.services.totals import calculate_totals
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors: dict[int, int] = {}
+
+    def record(self, status_code: int, latency: float) -> None:
+        if status_code == 200:
+            self.latencies.append(latency)
+        else:
+            self.errors[status_code] = self.errors.get(status_code, 0) + 1
+
+
+def random_receipt(rng: random.Random) -> receipt_schemas.ReceiptCreate:
+    products = [
+        receipt_schemas.ProductBase(
+            name=f"Stress product {rng.randint(1, 500)}",
+            price=round(rng.uniform(0.01, 500), 2),
+            quantity=rng.choice((1, 2, 3, round(rng.uniform(0.1, 5), 3))),
+        )
+        for _ in range(rng.randint(1, 8))
+    ]
+    total = sum(p.price * p.quantity for p in products)
+    return receipt_schemas.ReceiptCreate(
+        products=products,
+        payment=receipt_schemas.Payment(
+            type=rng.choice(("cash", "cashless")), amount=round(total + 100, 2)
+        ),
+    )
+
+
+async def signup_race(client: httpx.AsyncClient, prefix: str, attempts: int) -> int:
+    """Signs up one username from many clients at once; returns the winners."""
+    user = {"username": f"{prefix}race", "full_name": "Race", "password": "password"}
+    responses = await asyncio.gather(
+        *(client.post("/users/signup/", json=user) for _ in range(attempts))
+    )
+    return sum(r.status_code == 200 for r in responses)
+
+
+async def sign_in(client: httpx.AsyncClient, username: str) -> dict[str, str]:
+    user = {"username": username, "full_name": "Stress", "password": "password"}
+    response = await client.post("/users/signup/", json=user)
+    response.raise_for_status()
+    response = await client.post(
+        "/users/signin/", json={"username": username, "password": "password"}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    receipts: int,
+    rng: random.Random,
+    stats: Stats,
+    created: dict[uuid.UUID, receipt_schemas.ReceiptCreate],
+    replay_mismatches: list[str],
+) -> None:
+    for _ in range(receipts):
+        receipt = random_receipt(rng)
+        key = secrets.token_hex(8)
+        start = time.perf_counter()
+        response = await client.post(
+            "/receipts/",
+            json=receipt.model_dump(mode="json"),
+            headers={**headers, "Idempotency-Key": key},
+        )
+        stats.record(response.status_code, time.perf_counter() - start)
+        if response.status_code != 200:
+            continue
+        receipt_id = uuid.UUID(response.json()["id"])
+        created[receipt_id] = receipt
+
+        # Кожен десятий запит повторюється, як після втраченої відповіді
+        if rng.random() < 0.1:
+            replay = await client.post(
+                "/receipts/",
+                json=receipt.model_dump(mode="json"),
+                headers={**headers, "Idempotency-Key": key},
+            )
+            if replay.status_code != 200 or replay.json()["id"] != str(receipt_id):
+                replay_mismatches.append(str(receipt_id))
+
+
+async def sample(
+    connection, stats: Stats, interval: float, stop: asyncio.Event
+) -> list[tuple]:
+    """Records throughput, latency, pool usage and lock waits per interval."""
+    timeline = []
+    started = time.perf_counter()
+    seen = 0
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        window = stats.latencies[seen:]
+        seen += len(window)
+        waiting_locks = await connection.fetchval(
+            "SELECT count(*) FROM pg_locks WHERE NOT granted"
+        )
+        lock_waiters = await connection.fetchval(
+            "SELECT count(*) FROM pg_stat_activity"
+            " WHERE datname = current_database() AND wait_event_type = 'Lock'"
+        )
+        timeline.append(
+            (
+                time.perf_counter() - started,
+                len(window) / interval,
+                statistics.median(window) * 1000 if window else 0.0,
+                max(window) * 1000 if window else 0.0,
+                db.pool_usage(),
+                waiting_locks,
+                lock_waiters,
+            )
+        )
+    return timeline
+
+
+def user_ids_query(prefix: str):
+    return select(models.User.id).where(models.User.username.like(f"{prefix}%"))
+
+
+async def check_invariants(
+    created: dict[uuid.UUID, receipt_schemas.ReceiptCreate], prefix: str
+) -> list[str]:
+    violations = []
+    async with db.get_session_factory()() as session:
+        result = await session.execute(
+            select(models.Receipt).where(
+                models.Receipt.user_id.in_(user_ids_query(prefix))
+            )
+        )
+        stored = {r.id: r for r in result.unique().scalars()}
+
+        lost = created.keys() - stored.keys()
+        if lost:
+            violations.append(f"{len(lost)} acknowledged receipt(s) not stored")
+        unexpected = stored.keys() - created.keys()
+        if unexpected:
+            violations.append(f"{len(unexpected)} stored receipt(s) never acknowledged")
+
+        for receipt_id, receipt in created.items():
+            row = stored.get(receipt_id)
+            if row is None:
+                continue
+            total, rest = calculate_totals(receipt)
+            if (row.total, row.rest) != (total, rest):
+                violations.append(
+                    f"receipt {receipt_id}: stored {row.total}/{row.rest},"
+                    f" expected {total}/{rest}"
+                )
+            if row.short_link is None:
+                violations.append(f"receipt {receipt_id} has no short link")
+
+        duplicates = await session.scalar(
+            select(func.count()).select_from(
+                select(models.ShortLink.short_code)
+                .group_by(models.ShortLink.short_code)
+                .having(func.count() > 1)
+                .subquery()
+            )
+        )
+        if duplicates:
+            violations.append(f"{duplicates} duplicated short code(s)")
+    return violations
+
+
+async def cleanup(prefix: str) -> None:
+    async with db.get_session_factory()() as session:
+        user_ids = user_ids_query(prefix)
+        receipt_ids = select(models.Receipt.id).where(
+            models.Receipt.user_id.in_(user_ids)
+        )
+        for model in (models.IdempotencyKey, models.Product, models.ShortLink):
+            await session.execute(
+                delete(model).where(model.receipt_id.in_(receipt_ids))
+            )
+        await session.execute(
+            delete(models.Receipt).where(models.Receipt.id.in_(receipt_ids))
+        )
+        await session.execute(delete(models.User).where(models.User.id.in_(user_ids)))
+        await session.commit()
+
+
+async def run(args) -> int:
+    import asyncpg
+
+    settings.RATE_LIMIT_ENABLED = False
+    settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW = args.pool_size, 0
+    db.init_engine(echo=False)
+    if args.code_space:
+        width = len(encode_base62(args.code_space - 1, 12).lstrip("0")) or 1
+        models.ShortLink.generate_short_code = staticmethod(
+            lambda: encode_base62(random.randrange(args.code_space), width)
+        )
+    task_queue.start()
+
+    prefix = f"stress_{uuid.uuid4().hex[:8]}_"
+    rng = random.Random(args.seed)
+    stats = Stats()
+    created: dict[uuid.UUID, receipt_schemas.ReceiptCreate] = {}
+    replay_mismatches: list[str] = []
+    violations = []
+
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+    monitor = await asyncpg.connect(dsn)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://stress", timeout=60
+        ) as client:
+            winners = await signup_race(client, prefix, args.signup_race)
+            if winners != 1:
+                violations.append(f"{winners} concurrent signups of one name won")
+
+            headers = await asyncio.gather(
+                *(sign_in(client, f"{prefix}{i}") for i in range(args.clients))
+            )
+
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(sample(monitor, stats, args.interval, stop))
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    run_client(
+                        client,
+                        header,
+                        args.receipts,
+                        random.Random(rng.random()),
+                        stats,
+                        created,
+                        replay_mismatches,
+                    )
+                    for header in headers
+                )
+            )
+            elapsed = time.perf_counter() - started
+            stop.set()
+            timeline = await sampler
+
+        violations += await check_invariants(created, prefix)
+        if replay_mismatches:
+            violations.append(
+                f"{len(replay_mismatches)} idempotent replay(s) returned another receipt"
+            )
+    finally:
+        await task_queue.drain(5)
+        await monitor.close()
+        await cleanup(prefix)
+        await db.dispose_engine()
+
+    print(
+        f"{'t, s':>6} {'req/s':>8} {'p50 ms':>8} {'max ms':>8}"
+        f" {'pool':>5} {'locks':>6} {'waiters':>8}"
+    )
+    for t, rps, p50, worst, pool, locks, waiters in timeline:
+        print(
+            f"{t:>6.1f} {rps:>8.0f} {p50:>8.1f} {worst:>8.1f}"
+            f" {pool:>5.0%} {locks:>6} {waiters:>8}"
+        )
+
+    latencies = sorted(stats.latencies)
+    print(
+        f"\n{len(latencies)} receipts in {elapsed:.1f} s"
+        f" ({len(latencies) / elapsed:.0f} req/s)"
+    )
+    if latencies:
+        p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+        print(
+            f"latency p50 {statistics.median(latencies) * 1000:.1f} ms,"
+            f" p99 {p99 * 1000:.1f} ms"
+        )
+    if stats.errors:
+        print(f"errors by status: {stats.errors}")
+    if timeline:
+        print(f"max waiting locks: {max(row[5] for row in timeline)}")
+
+    for violation in violations:
+        print(f"VIOLATION: {violation}")
+    print("invariants OK" if not violations else f"{len(violations)} violation(s)")
+    return 1 if violations else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--receipts", type=int, default=20, help="Receipts per client")
+    parser.add_argument("--signup-race", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--pool-size", type=int, default=settings.DB_POOL_SIZE)
+    parser.add_argument("--code-space", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
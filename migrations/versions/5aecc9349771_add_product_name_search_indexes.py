@@ -0,0 +1,45 @@
+"""Add product name search indexes
+
+Revision ID: 5aecc9349771
+Revises: d0110e76f110
+Create Date: 2026-10-19 11:40:03.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5aecc9349771'
+down_revision: Union[str, None] = 'd0110e76f110'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY не можна виконувати всередині транзакції
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_name_trgm',
+            'products',
+            ['name'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f('ix_products_receipt_id'),
+            'products',
+            ['receipt_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_products_receipt_id'), table_name='products')
+    op.drop_index('ix_products_name_trgm', table_name='products')
@@ -0,0 +1,102 @@
+"""Add minor unit money columns
+
+Revision ID: 9e3b1f6a2d47
+Revises: 45bf8ad6d8a8
+Create Date: 2026-10-19 21:14:08.512337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b1f6a2d47'
+down_revision: Union[str, None] = '45bf8ad6d8a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('receipts', sa.Column('payment_amount_minor', sa.BigInteger(), nullable=True))
+    op.add_column('receipts', sa.Column('total_minor', sa.BigInteger(), nullable=True))
+    op.add_column('receipts', sa.Column('rest_minor', sa.BigInteger(), nullable=True))
+    op.add_column('products', sa.Column('price_minor', sa.BigInteger(), nullable=True))
+    op.add_column('products', sa.Column('quantity_minor', sa.BigInteger(), nullable=True))
+    # Numeric(10, 2) зберігає рівно дві цифри після коми, тож множення точне
+    op.execute(
+        """
+        UPDATE receipts SET
+            payment_amount_minor = (payment_amount * 100)::bigint,
+            total_minor = (total * 100)::bigint,
+            rest_minor = (rest * 100)::bigint
+        """
+    )
+    op.execute(
+        """
+        UPDATE products SET
+            price_minor = (price * 100)::bigint,
+            quantity_minor = (quantity * 100)::bigint
+        """
+    )
+    # Застосунок пише гроші лише в колонках свого MONEY_MODE, решту доповнює
+    # тригер. Суми чеків після створення не змінюються, тож досить INSERT
+    op.execute(
+        """
+        CREATE FUNCTION receipts_fill_money() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.total IS NULL THEN
+                NEW.payment_amount := NEW.payment_amount_minor / 100.0;
+                NEW.total := NEW.total_minor / 100.0;
+                NEW.rest := NEW.rest_minor / 100.0;
+            ELSIF NEW.total_minor IS NULL THEN
+                NEW.payment_amount_minor := (NEW.payment_amount * 100)::bigint;
+                NEW.total_minor := (NEW.total * 100)::bigint;
+                NEW.rest_minor := (NEW.rest * 100)::bigint;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER receipts_fill_money BEFORE INSERT ON receipts
+        FOR EACH ROW EXECUTE FUNCTION receipts_fill_money()
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION products_fill_money() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.price IS NULL THEN
+                NEW.price := NEW.price_minor / 100.0;
+                NEW.quantity := NEW.quantity_minor / 100.0;
+            ELSIF NEW.price_minor IS NULL THEN
+                NEW.price_minor := (NEW.price * 100)::bigint;
+                NEW.quantity_minor := (NEW.quantity * 100)::bigint;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER products_fill_money BEFORE INSERT ON products
+        FOR EACH ROW EXECUTE FUNCTION products_fill_money()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER products_fill_money ON products')
+    op.execute('DROP FUNCTION products_fill_money()')
+    op.execute('DROP TRIGGER receipts_fill_money ON receipts')
+    op.execute('DROP FUNCTION receipts_fill_money()')
+    op.drop_column('products', 'quantity_minor')
+    op.drop_column('products', 'price_minor')
+    op.drop_column('receipts', 'rest_minor')
+    op.drop_column('receipts', 'total_minor')
+    op.drop_column('receipts', 'payment_amount_minor')
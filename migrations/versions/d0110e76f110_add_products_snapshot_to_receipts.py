@@ -0,0 +1,43 @@
+"""Add products snapshot to receipts
+
+Revision ID: d0110e76f110
+Revises: 04f5d7c4ffb1
+Create Date: 2026-10-19 10:12:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0110e76f110'
+down_revision: Union[str, None] = '04f5d7c4ffb1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('receipts', sa.Column('products_snapshot', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    # Backfill existing receipts so reads no longer need the products table
+    op.execute(
+        """
+        UPDATE receipts SET products_snapshot = (
+            SELECT jsonb_agg(
+                jsonb_build_object(
+                    'name', p.name,
+                    'price', p.price::text,
+                    'quantity', p.quantity::text
+                ) ORDER BY p.id
+            )
+            FROM products p
+            WHERE p.receipt_id = receipts.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('receipts', 'products_snapshot')